@@ -9,18 +9,26 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
 
 from flask import Flask, request, jsonify, render_template, send_file
 from flask_cors import CORS
+from flask.json.provider import DefaultJSONProvider
+import orjson
+import re
 import csv
 import io
 import json
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urlparse
+from collections import Counter, defaultdict
 from form_validator import FormValidator
 from analytics_detection import AnalyticsDetection
 from cms_detection import CMSDetection
 from element_analyzer_playwright import ElementAnalyzerPlaywright
+from element_analyzer import ElementAnalyzer
 from sitemap_parser import SitemapParser
 from extract_links import LinkExtractor
 from internal_link_logger import InternalLinkLogger
-from combined_link_extractor import CombinedLinkExtractor
+from combined_link_extractor import CombinedLinkExtractor, SKIPPED_HREF_PREFIXES, HTTP_SCHEMES, resolve_href
+from page_fetcher import PageFetcher, parse_html
+from http_session import shared_session
+from lru_cache import LRUCache
 
 # Configure logging
 logging.basicConfig(
@@ -29,56 +37,73 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class OrjsonProvider(DefaultJSONProvider):
+    """jsonify through orjson; link and deep-analysis responses carry thousands of small dicts"""
+
+    def dumps(self, obj, **kwargs):
+        # Same output shape as Flask's encoder: sorted keys, indented only when Flask asks for it
+        option = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)
 
+SOCIAL_PATTERN = re.compile(r'(facebook|twitter|instagram|linkedin|youtube|tiktok)\.com')
+IMPORTANT_META_NAMES = frozenset(['description', 'keywords', 'author', 'viewport', 'robots'])
+# Elements analyze_elements needs to inspect individually; everything else is only counted
+INSPECTED_TAGS = frozenset(['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'img', 'form', 'a', 'meta', 'link', 'input'])
+BUTTON_INPUT_TYPES = frozenset(['button', 'submit'])
+
 class BasicAnalyzer:
     """Fallback analyzer using only basic libraries"""
     
     def __init__(self):
-        self.session = request.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        self.session = shared_session
     
     def extract_links(self, url):
         """Basic link extraction"""
         try:
-            print(f"🔗 Extracting links from: {url}")
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
+            logger.debug(f"🔗 Extracting links from: {url}")
+            tree = PageFetcher(self.session).fetch(url).tree
             base_domain = urlparse(url).netloc
             
             internal_links = []
             external_links = []
+            internal_seen = set()
+            external_seen = set()
             
-            for link in soup.find_all('a', href=True):
-                href = link.get('href', '').strip()
-                if not href or href.startswith('#') or href.startswith('javascript:'):
+            for link in tree.css('a[href]'):
+                href = (link.attributes.get('href') or '').strip()
+                if not href or href.startswith(SKIPPED_HREF_PREFIXES):
                     continue
                 
-                absolute_url = urljoin(url, href)
-                parsed_url = urlparse(absolute_url)
+                absolute_url, scheme, netloc = resolve_href(url, href)
                 
-                if parsed_url.scheme not in ['http', 'https']:
+                if scheme not in HTTP_SCHEMES:
                     continue
                 
                 link_data = {
                     'url': absolute_url,
-                    'text': link.get_text(strip=True)[:100],
-                    'title': link.get('title', ''),
+                    'text': link.text(strip=True)[:100],
+                    'title': link.attributes.get('title') or '',
                 }
                 
-                if parsed_url.netloc == base_domain:
-                    if absolute_url not in [l['url'] for l in internal_links]:
+                if netloc == base_domain:
+                    if absolute_url not in internal_seen:
+                        internal_seen.add(absolute_url)
                         internal_links.append(link_data)
                 else:
-                    if absolute_url not in [l['url'] for l in external_links]:
+                    if absolute_url not in external_seen:
+                        external_seen.add(absolute_url)
                         external_links.append(link_data)
             
-            print(f"✅ Found {len(internal_links)} internal and {len(external_links)} external links")
+            logger.info(f"✅ Found {len(internal_links)} internal and {len(external_links)} external links")
             return {
                 'internal_links': internal_links,
                 'external_links': external_links,
@@ -86,49 +111,46 @@ class BasicAnalyzer:
             }
             
         except Exception as e:
-            print(f"❌ Link extraction failed: {e}")
+            logger.error(f"❌ Link extraction failed: {e}")
             return {'internal_links': [], 'external_links': [], 'total_links': 0, 'error': str(e)}
     
     def detect_cms(self, url):
         """Basic CMS detection"""
         try:
-            print(f"🔧 Detecting CMS for: {url}")
+            logger.debug(f"🔧 Detecting CMS for: {url}")
             response = self.session.get(url, timeout=10)
             response.raise_for_status()
             
-            html_content = response.text.lower()
-            soup = BeautifulSoup(response.content, 'html.parser')
+            html_bytes = response.content.lower()
             
             detected_cms = []
             
-            # WordPress detection
-            wp_indicators = [
-                'wp-content' in html_content,
-                'wp-includes' in html_content,
-                soup.find('meta', {'name': 'generator', 'content': lambda x: x and 'wordpress' in x.lower()}),
-                soup.find('link', {'href': lambda x: x and 'wp-content' in x})
-            ]
-            if any(wp_indicators):
+            # WordPress detection; stop at the first indicator, so the body is only parsed
+            # for the generator meta tag when neither path shows up in the raw bytes
+            if (b'wp-content' in html_bytes
+                    or b'wp-includes' in html_bytes
+                    or any('wordpress' in (meta.attributes.get('content') or '').lower()
+                           for meta in parse_html(response).css('meta[name="generator"]'))):
                 detected_cms.append('WordPress')
             
             # Shopify detection
-            if 'shopify' in html_content or 'cdn.shopify' in html_content:
+            if b'shopify' in html_bytes:
                 detected_cms.append('Shopify')
             
             # Drupal detection
-            if 'drupal' in html_content:
+            if b'drupal' in html_bytes:
                 detected_cms.append('Drupal')
             
             # Joomla detection
-            if 'joomla' in html_content:
+            if b'joomla' in html_bytes:
                 detected_cms.append('Joomla')
             
             # Wix detection
-            if 'wix.com' in html_content or 'wixstatic.com' in html_content:
+            if b'wix.com' in html_bytes or b'wixstatic.com' in html_bytes:
                 detected_cms.append('Wix')
             
             # Squarespace detection
-            if 'squarespace' in html_content:
+            if b'squarespace' in html_bytes:
                 detected_cms.append('Squarespace')
             
             result = {
@@ -137,17 +159,17 @@ class BasicAnalyzer:
                 'total_detected': len(detected_cms)
             }
             
-            print(f"✅ CMS Detection complete. Found: {', '.join(detected_cms) if detected_cms else 'None'}")
+            logger.info(f"✅ CMS Detection complete. Found: {', '.join(detected_cms) if detected_cms else 'None'}")
             return result
             
         except Exception as e:
-            print(f"❌ CMS Detection failed: {e}")
+            logger.error(f"❌ CMS Detection failed: {e}")
             return {'primary_cms': None, 'detected_systems': [], 'total_detected': 0, 'error': str(e)}
     
     def detect_analytics(self, url):
         """Basic analytics detection"""
         try:
-            print(f"📊 Detecting analytics for: {url}")
+            logger.debug(f"📊 Detecting analytics for: {url}")
             response = self.session.get(url, timeout=10)
             response.raise_for_status()
             
@@ -179,47 +201,63 @@ class BasicAnalyzer:
                 'total_detected': len(detected_tools)
             }
             
-            print(f"✅ Analytics detection complete. Found: {', '.join(detected_tools) if detected_tools else 'None'}")
+            logger.info(f"✅ Analytics detection complete. Found: {', '.join(detected_tools) if detected_tools else 'None'}")
             return result
             
         except Exception as e:
-            print(f"❌ Analytics detection failed: {e}")
+            logger.error(f"❌ Analytics detection failed: {e}")
             return {'detected_tools': [], 'total_detected': 0, 'error': str(e)}
     
-    def analyze_elements(self, url):
-        """Enhanced element analysis with detailed detection"""
+    def analyze_elements(self, url, tree=None):
+        """Enhanced element analysis with detailed detection
+        
+        The parsed tree can be passed in when the page was already fetched.
+        """
         try:
-            print(f"🔍 Analyzing elements for: {url}")
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
+            logger.debug(f"🔍 Analyzing elements for: {url}")
+            if tree is None:
+                response = self.session.get(url, timeout=10)
+                response.raise_for_status()
+                
+                tree = parse_html(response)
+            
+            # A single walk over the tree feeds every count below
+            tag_counts = Counter()
+            elements_by_tag = defaultdict(list)
+            for node in tree.root.traverse():
+                tag = node.tag
+                if tag[0] == '-':  # comments and other non-element nodes
+                    continue
+                tag_counts[tag] += 1
+                if tag in INSPECTED_TAGS:
+                    elements_by_tag[tag].append(node)
             
             # Count headings with actual content
             headings = {}
             heading_content = {}
             for i in range(1, 7):
-                h_elements = soup.find_all(f'h{i}')
+                h_elements = elements_by_tag[f'h{i}']
                 headings[f'h{i}'] = len(h_elements)
-                heading_content[f'h{i}'] = [h.get_text(strip=True)[:50] for h in h_elements[:3]]  # First 3 headings
+                heading_content[f'h{i}'] = [h.text(strip=True)[:50] for h in h_elements[:3]]  # First 3 headings
             
             # Analyze images with detailed info
-            images = soup.find_all('img')
-            images_without_alt = [img for img in images if not img.get('alt')]
-            images_with_alt = [img for img in images if img.get('alt')]
+            images = elements_by_tag['img']
+            # Only the counts are reported, so count in one pass instead of building two lists
+            images_without_alt = sum(1 for img in images if not img.attributes.get('alt'))
+            images_with_alt = len(images) - images_without_alt
             
             # Analyze forms with input details
-            forms = soup.find_all('form')
+            forms = elements_by_tag['form']
             form_details = []
             for form in forms:
-                inputs = form.find_all('input')
-                textareas = form.find_all('textarea')
-                selects = form.find_all('select')
-                buttons = form.find_all(['button', 'input[type="submit"]'])
+                inputs = form.css('input')
+                textareas = form.css('textarea')
+                selects = form.css('select')
+                buttons = form.css('button, input[type="submit"]')
                 
                 form_details.append({
-                    'action': form.get('action', ''),
-                    'method': form.get('method', 'GET'),
+                    'action': form.attributes.get('action') or '',
+                    'method': form.attributes.get('method') or 'GET',
                     'inputs': len(inputs),
                     'textareas': len(textareas),
                     'selects': len(selects),
@@ -227,16 +265,20 @@ class BasicAnalyzer:
                 })
             
             # Analyze links with categories
-            links = soup.find_all('a', href=True)
+            links = [link for link in elements_by_tag['a'] if 'href' in link.attributes]
             internal_links = 0
             external_links = 0
             email_links = 0
             phone_links = 0
+            social_links = set()
+            links_without_text = 0
+            links_without_label = 0
             
             base_domain = urlparse(url).netloc
             
+            # One visit per link covers the categories, social platforms and accessibility counts
             for link in links:
-                href = link.get('href', '')
+                href = link.attributes.get('href') or ''
                 if href.startswith('mailto:'):
                     email_links += 1
                 elif href.startswith('tel:'):
@@ -247,40 +289,42 @@ class BasicAnalyzer:
                         internal_links += 1
                     else:
                         external_links += 1
+                
+                social_match = SOCIAL_PATTERN.search(href.lower())
+                if social_match:
+                    social_links.add(social_match.group(1).title())
+                
+                if not link.text(strip=True):
+                    links_without_text += 1
+                    if not link.attributes.get('aria-label'):
+                        links_without_label += 1
             
             # Analyze meta tags with important ones
-            meta_tags = soup.find_all('meta')
+            meta_tags = elements_by_tag['meta']
             important_meta = {}
             
             for meta in meta_tags:
-                name = meta.get('name') or meta.get('property')
-                content = meta.get('content')
+                name = meta.attributes.get('name') or meta.attributes.get('property')
+                content = meta.attributes.get('content')
                 if name and content:
-                    if name.lower() in ['description', 'keywords', 'author', 'viewport', 'robots']:
-                        important_meta[name.lower()] = content[:100]
+                    name = name.lower()
+                    if name in IMPORTANT_META_NAMES:
+                        important_meta[name] = content[:100]
             
             # Detect interactive elements
-            buttons = soup.find_all(['button', 'input[type="button"]', 'input[type="submit"]'])
+            button_inputs = sum(1 for field in elements_by_tag['input']
+                                if (field.attributes.get('type') or '').lower() in BUTTON_INPUT_TYPES)
+            buttons = tag_counts['button'] + button_inputs
             
             # Detect media elements
-            videos = soup.find_all('video')
-            audio = soup.find_all('audio')
-            iframes = soup.find_all('iframe')
-            
-            # Detect social media elements
-            social_links = []
-            social_patterns = ['facebook.com', 'twitter.com', 'instagram.com', 'linkedin.com', 'youtube.com', 'tiktok.com']
-            for link in links:
-                href = link.get('href', '').lower()
-                for pattern in social_patterns:
-                    if pattern in href:
-                        social_links.append(pattern.replace('.com', '').title())
-                        break
+            videos = tag_counts['video']
+            audio = tag_counts['audio']
+            iframes = tag_counts['iframe']
             
             # Calculate accessibility score
             accessibility_issues = 0
-            accessibility_issues += len(images_without_alt)  # Images without alt text
-            accessibility_issues += len([link for link in links if not link.get_text(strip=True) and not link.get('aria-label')])  # Links without text
+            accessibility_issues += images_without_alt  # Images without alt text
+            accessibility_issues += links_without_label  # Links without text
             
             accessibility_score = max(0, 100 - (accessibility_issues * 5))
             
@@ -294,9 +338,9 @@ class BasicAnalyzer:
                 },
                 'images': {
                     'total_images': len(images),
-                    'with_alt_text': len(images_with_alt),
-                    'missing_alt_text': len(images_without_alt),
-                    'alt_text_percentage': (len(images_with_alt) / len(images) * 100) if images else 0
+                    'with_alt_text': images_with_alt,
+                    'missing_alt_text': images_without_alt,
+                    'alt_text_percentage': (images_with_alt / len(images) * 100) if images else 0
                 },
                 'forms': {
                     'total_forms': len(forms),
@@ -310,7 +354,7 @@ class BasicAnalyzer:
                     'external_links': external_links,
                     'email_links': email_links,
                     'phone_links': phone_links,
-                    'social_platforms': list(set(social_links))
+                    'social_platforms': list(social_links)
                 },
                 'meta_tags': {
                     'total_meta_tags': len(meta_tags),
@@ -319,40 +363,49 @@ class BasicAnalyzer:
                     'has_viewport': 'viewport' in important_meta
                 },
                 'interactive_elements': {
-                    'buttons': len(buttons),
+                    'buttons': buttons,
                     'forms': len(forms),
-                    'total_interactive': len(buttons) + len(forms)
+                    'total_interactive': buttons + len(forms)
                 },
                 'media_elements': {
-                    'videos': len(videos),
-                    'audio': len(audio),
-                    'iframes': len(iframes),
-                    'total_media': len(videos) + len(audio) + len(iframes)
+                    'videos': videos,
+                    'audio': audio,
+                    'iframes': iframes,
+                    'total_media': videos + audio + iframes
                 },
                 'accessibility': {
                     'score': accessibility_score,
                     'issues_found': accessibility_issues,
-                    'images_without_alt': len(images_without_alt),
-                    'links_without_text': len([link for link in links if not link.get_text(strip=True)])
+                    'images_without_alt': images_without_alt,
+                    'links_without_text': links_without_text
                 },
                 'page_structure': {
-                    'total_elements': len(soup.find_all()),
-                    'scripts': len(soup.find_all('script')),
-                    'stylesheets': len(soup.find_all('link', rel='stylesheet')),
-                    'divs': len(soup.find_all('div')),
-                    'paragraphs': len(soup.find_all('p'))
+                    'total_elements': sum(tag_counts.values()),
+                    'scripts': tag_counts['script'],
+                    'stylesheets': sum(1 for link in elements_by_tag['link']
+                                       if 'stylesheet' in (link.attributes.get('rel') or '').split()),
+                    'divs': tag_counts['div'],
+                    'paragraphs': tag_counts['p']
                 }
             }
         
-            print(f"✅ Enhanced element analysis complete")
+            logger.info(f"✅ Enhanced element analysis complete")
             return result
         
         except Exception as e:
-            print(f"❌ Element analysis failed: {e}")
+            logger.error(f"❌ Element analysis failed: {e}")
             return {'error': str(e)}
 
-# Initialize basic analyzer
+# Initialize analyzers once so their pooled connections are reused across requests
 basic_analyzer = BasicAnalyzer()
+cms_detector = CMSDetection()
+analytics_detector = AnalyticsDetection()
+link_extractor = CombinedLinkExtractor()
+quick_link_extractor = LinkExtractor()
+element_analyzer = ElementAnalyzer()
+
+# (url, content digest) -> (elements, cms, analytics); an unchanged page skips parsing and detection
+detection_cache = LRUCache(maxsize=256)
 
 @app.route("/")
 def index():
@@ -411,35 +464,40 @@ def analyze_website():
         url = data['url']
         logger.info(f"🔍 Starting website analysis for: {url}")
         
-        # Initialize analyzers
-        link_extractor = CombinedLinkExtractor()
-        element_analyzer = ElementAnalyzer()
-        cms_detector = CMSDetector()
-        analytics_detector = AnalyticsDetector()
+        # Fetch and parse the page once, the link extractor and every detector below reuse it
+        page_fetcher = PageFetcher(shared_session)
+        page = page_fetcher.fetch(url)
         
         # Extract links
         logger.info("📋 Extracting links...")
-        link_result = link_extractor.extract_links(url)
-        
+        link_result = link_extractor.extract_all_links(url, tree=page.tree)
         if 'error' in link_result:
             return jsonify(link_result), 500
         
-        # Analyze elements
-        logger.info("🔍 Analyzing page elements...")
-        element_result = element_analyzer.analyze_elements(url)
-        
-        # Detect CMS
-        logger.info("🔧 Detecting CMS...")
-        cms_result = cms_detector.detect_cms(url)
-        
-        # Detect analytics
-        logger.info("📊 Detecting analytics tools...")
-        analytics_result = analytics_detector.detect_analytics(url)
+        cached_detection = detection_cache.get((url, page.digest))
+        if cached_detection:
+            logger.info("♻️ Page unchanged, reusing previous detection results")
+            element_result, cms_result, analytics_result = cached_detection
+        else:
+            # Analyze elements
+            logger.info("🔍 Analyzing page elements...")
+            element_result = basic_analyzer.analyze_elements(url, tree=page.tree)
+            
+            # Detect CMS
+            logger.info("🔧 Detecting CMS...")
+            cms_result = cms_detector.detect_cms(url, tree=page.tree, html_bytes=page.html_bytes)
+            
+            # Detect analytics
+            logger.info("📊 Detecting analytics tools...")
+            analytics_result = analytics_detector.detect_analytics(url, html_bytes=page.html_bytes)
+            
+            if not any('error' in result for result in (element_result, cms_result, analytics_result)):
+                detection_cache.put((url, page.digest), (element_result, cms_result, analytics_result))
         
         # Combine results
         combined_result = {
             **link_result,
-            'elements': element_result.get('elements', {}),
+            'elements': element_result,
             'cms_detected': cms_result,
             'analytics_tools': analytics_result,
             'timestamp': datetime.now().isoformat(),
@@ -472,9 +530,6 @@ def analyze_all_links():
         
         logger.info(f"🔍 Starting deep analysis for: {url}")
         
-        # Initialize analyzer
-        element_analyzer = ElementAnalyzer()
-        
         # Perform deep analysis
         result = element_analyzer.analyze_multiple_pages(url, max_links=max_links)
         
@@ -506,11 +561,8 @@ def quick_links():
         url = data['url']
         logger.info(f"🔍 Starting quick link extraction for: {url}")
         
-        # Initialize link extractor
-        link_extractor = LinkExtractor()
-        
         # Extract links quickly
-        result = link_extractor.extract_links_quick(url)
+        result = quick_link_extractor.get_all_links(url)
         
         # Add quick mode flag
         result['quick_mode'] = True
@@ -546,9 +598,10 @@ if __name__ == '__main__':
     logger.info("  - POST /quick-links - Quick link extraction")
     logger.info("  - GET /health - Health check")
     
+    # Development server only; production runs under gunicorn (see gunicorn.conf.py)
     app.run(
         host='0.0.0.0',
         port=5000,
-        debug=True,
+        debug=os.environ.get('FLASK_DEBUG') == '1',
         threaded=True
     )
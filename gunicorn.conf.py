@@ -0,0 +1,13 @@
+import multiprocessing
+import os
+
+# Production server settings, used automatically by `gunicorn app:app` from the project root
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+
+# The audits are mostly network waits, so each process runs a pool of threads
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+# Deep analysis fetches dozens of pages in one request
+timeout = 120
@@ -1,42 +1,67 @@
-import requests
-from bs4 import BeautifulSoup
+import logging
 import re
+from http_session import shared_session
+
+logger = logging.getLogger(__name__)
+
+def facebook_tracking_request(html_bytes):
+    """True if some line has 'facebook.net' followed later by 'tr?', checked in linear time"""
+    # The old facebook\.net.*tr\? regex rescanned to the end of the line from every 'facebook.net',
+    # which is quadratic on long minified lines
+    start = html_bytes.find(b'facebook.net')
+    while start != -1:
+        line_end = html_bytes.find(b'\n', start)
+        if line_end == -1:
+            line_end = len(html_bytes)
+        if html_bytes.find(b'tr?', start + len(b'facebook.net'), line_end) != -1:
+            return True
+        # Later occurrences on the same line only see a shorter part of it
+        start = html_bytes.find(b'facebook.net', line_end)
+    return False
 
 class AnalyticsDetection:
+    # (label, probe) pairs searched in the lowercased raw body. Fixed strings are plain substring
+    # checks; only the two real patterns use the regex engine, and none of them needs re.I.
+    # Labels keep the original regex text, which is what the evidence reports.
+    GA_PROBES = [
+        (r'google-analytics\.com', b'google-analytics.com'),
+        (r'googletagmanager\.com', b'googletagmanager.com'),
+        (r'gtag\(', b'gtag('),
+        (r'ga\(', b'ga('),
+        (r'UA-\d+-\d+', re.compile(rb'ua-\d+-\d+')),
+        (r'G-[A-Z0-9]+', re.compile(rb'g-[a-z0-9]+'))
+    ]
+    GTM_PROBE = GA_PROBES[1]
+    FB_PROBES = [facebook_tracking_request, b'fbq(', b'facebook pixel']
+    
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        self.session = shared_session
     
-    def detect_analytics(self, url):
-        """Detect analytics and marketing tools"""
+    def detect_analytics(self, url, html_bytes=None):
+        """Detect analytics and marketing tools
+        
+        html_bytes (the lowercased raw body) can be passed in when the page was already fetched.
+        """
         try:
-            print(f"📊 Detecting analytics tools for: {url}")
-            
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
+            logger.debug(f"📊 Detecting analytics tools for: {url}")
             
-            html_content = response.text
+            if html_bytes is None:
+                response = self.session.get(url, timeout=10)
+                response.raise_for_status()
+                
+                html_bytes = response.content.lower()
             detected_tools = {}
             
             # Google Analytics detection
-            ga_patterns = [
-                r'google-analytics\.com',
-                r'googletagmanager\.com',
-                r'gtag\(',
-                r'ga\(',
-                r'UA-\d+-\d+',
-                r'G-[A-Z0-9]+'
-            ]
-            
-            ga_score = 0
-            ga_evidence = []
-            
-            for pattern in ga_patterns:
-                if re.search(pattern, html_content, re.I):
-                    ga_score += 25
-                    ga_evidence.append(f'Pattern found: {pattern}')
+            ga_matches = []
+            for probe in self.GA_PROBES:
+                if self._found(probe[1], html_bytes):
+                    ga_matches.append(probe)
+                    # Four hits already cap confidence at 100 and fill the three evidence slots
+                    if len(ga_matches) * 25 >= 100:
+                        break
+            ga_score = 25 * len(ga_matches)
+            ga_evidence = [f'Pattern found: {label}' for label, _ in ga_matches]
             
             if ga_score > 0:
                 detected_tools['Google Analytics'] = {
@@ -46,8 +71,8 @@ class AnalyticsDetection:
                     'category': 'Analytics'
                 }
             
-            # Google Tag Manager
-            if re.search(r'googletagmanager\.com', html_content, re.I):
+            # Google Tag Manager (its pattern was already searched as part of the GA set)
+            if self.GTM_PROBE in ga_matches:
                 detected_tools['Google Tag Manager'] = {
                     'detected': True,
                     'confidence': 90,
@@ -56,8 +81,7 @@ class AnalyticsDetection:
                 }
             
             # Facebook Pixel
-            fb_patterns = [r'facebook\.net.*tr\?', r'fbq\(', r'facebook pixel']
-            fb_score = sum(30 for pattern in fb_patterns if re.search(pattern, html_content, re.I))
+            fb_score = sum(30 for probe in self.FB_PROBES if self._found(probe, html_bytes))
             
             if fb_score > 0:
                 detected_tools['Facebook Pixel'] = {
@@ -68,7 +92,7 @@ class AnalyticsDetection:
                 }
             
             # Hotjar
-            if re.search(r'hotjar', html_content, re.I):
+            if b'hotjar' in html_bytes:
                 detected_tools['Hotjar'] = {
                     'detected': True,
                     'confidence': 85,
@@ -77,7 +101,7 @@ class AnalyticsDetection:
                 }
             
             # Mixpanel
-            if re.search(r'mixpanel', html_content, re.I):
+            if b'mixpanel' in html_bytes:
                 detected_tools['Mixpanel'] = {
                     'detected': True,
                     'confidence': 85,
@@ -97,15 +121,15 @@ class AnalyticsDetection:
             result = {
                 'detected_tools': detected_tools,
                 'categories': categories,
-                'total_detected': len([t for t, d in detected_tools.items() if d['detected']]),
+                'total_detected': sum(1 for d in detected_tools.values() if d['detected']),
                 'analysis_complete': True
             }
             
-            print(f"✅ Analytics detection complete. Found {result['total_detected']} tools")
+            logger.info(f"✅ Analytics detection complete. Found {result['total_detected']} tools")
             return result
             
         except Exception as e:
-            print(f"❌ Analytics detection failed: {e}")
+            logger.error(f"❌ Analytics detection failed: {e}")
             return {
                 'detected_tools': {},
                 'categories': {},
@@ -113,3 +137,12 @@ class AnalyticsDetection:
                 'error': str(e),
                 'analysis_complete': False
             }
+    
+    @staticmethod
+    def _found(probe, html_bytes):
+        """Substring check for literal probes, a call for function probes, regex search for compiled ones"""
+        if isinstance(probe, bytes):
+            return probe in html_bytes
+        if callable(probe):
+            return probe(html_bytes)
+        return probe.search(html_bytes) is not None
@@ -0,0 +1,91 @@
+# JavaScript evaluated inside the page by the browser-based element analyzers
+
+# Collects everything the analyzers read from the DOM in a single round trip.
+# Attribute values come from getAttribute so they match what per-element lookups returned;
+# pass resolveUrls=true to get absolute img.src the way Selenium's get_attribute does.
+# Links are classified in the page by comparing each resolved host with the page's own host.
+PAGE_SNAPSHOT_JS = """
+(resolveUrls) => {
+    const attr = (el, name) => el.getAttribute(name);
+    const url = (el, name) => resolveUrls && el.hasAttribute(name) ? el[name] : attr(el, name);
+    const images = document.querySelectorAll('img');
+    const anchors = document.querySelectorAll('a');
+    const links = {total: anchors.length, internal: 0, external: 0, empty: 0};
+    for (const a of anchors) {
+        const href = attr(a, 'href');
+        if (!href) {
+            links.empty++;
+            continue;
+        }
+        let host = null;
+        try {
+            host = new URL(href, location.href).host;
+        } catch (e) {}
+        if (host === location.host) {
+            links.internal++;
+        } else {
+            links.external++;
+        }
+    }
+    return {
+        title: document.title,
+        headings: Array.from(document.querySelectorAll('h1, h2, h3, h4, h5, h6')).reduce((levels, e) => {
+            const text = e.innerText.trim();
+            if (text) {
+                levels[e.tagName.toLowerCase()].push(text);
+            }
+            return levels;
+        }, {h1: [], h2: [], h3: [], h4: [], h5: [], h6: []}),
+        imageCount: images.length,
+        images: Array.from(images).slice(0, 20).map(img => ({
+            src: url(img, 'src'),
+            alt: attr(img, 'alt'),
+            width: attr(img, 'width'),
+            height: attr(img, 'height')
+        })),
+        forms: Array.from(document.querySelectorAll('form'), form => ({
+            action: attr(form, 'action'),
+            method: attr(form, 'method'),
+            inputs: form.querySelectorAll('input').length,
+            textareas: form.querySelectorAll('textarea').length,
+            selects: form.querySelectorAll('select').length
+        })),
+        links: links,
+        meta: Array.from(document.querySelectorAll('meta'),
+            m => [attr(m, 'name') || attr(m, 'property'), attr(m, 'content')])
+    };
+}
+"""
+
+# Extra page data ElementAnalyzerSelenium reports; each section is null if the browser can't provide it
+SELENIUM_METRICS_JS = """
+() => {
+    const count = xpath => document.evaluate(`count(${xpath})`, document, null, XPathResult.NUMBER_TYPE, null).numberValue;
+    let performance = null;
+    let accessibility = null;
+    try {
+        const timing = window.performance.timing;
+        performance = {
+            navigationStart: timing.navigationStart,
+            loadEventEnd: timing.loadEventEnd,
+            domElements: count('//*'),
+            scripts: document.getElementsByTagName('script').length,
+            links: document.getElementsByTagName('link').length
+        };
+    } catch (e) {}
+    try {
+        accessibility = {
+            imagesWithoutAlt: count("//img[not(@alt) or @alt='']"),
+            linksWithoutText: count("//a[not(text()) and not(@aria-label) and not(@title)]"),
+            skipLinks: count("//a[contains(@href, '#') and (contains(text(), 'skip') or contains(@class, 'skip'))]")
+        };
+    } catch (e) {}
+    return {
+        url: location.href,
+        // chromedriver builds page_source the same way
+        pageSourceLength: new XMLSerializer().serializeToString(document).length,
+        performance: performance,
+        accessibility: accessibility
+    };
+}
+"""
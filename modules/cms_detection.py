@@ -1,24 +1,27 @@
-import requests
-from bs4 import BeautifulSoup
-import re
+import logging
+from http_session import shared_session
+from page_fetcher import parse_html
+
+logger = logging.getLogger(__name__)
 
 class CMSDetection:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        self.session = shared_session
     
-    def detect_cms(self, url):
-        """Detect CMS and return detailed information"""
+    def detect_cms(self, url, tree=None, html_bytes=None):
+        """Detect CMS and return detailed information
+        
+        The parsed tree and html_bytes (the lowercased raw body) can be passed in when the page was already fetched.
+        """
         try:
-            print(f"🔧 Detecting CMS for: {url}")
-            
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
+            logger.debug(f"🔧 Detecting CMS for: {url}")
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            html_content = response.text.lower()
+            if tree is None or html_bytes is None:
+                response = self.session.get(url, timeout=10)
+                response.raise_for_status()
+                
+                tree = parse_html(response)
+                html_bytes = response.content.lower()
             
             detected_systems = {}
             
@@ -26,15 +29,17 @@ class CMSDetection:
             wp_score = 0
             wp_evidence = []
             
-            if 'wp-content' in html_content:
+            if b'wp-content' in html_bytes:
                 wp_score += 30
                 wp_evidence.append('wp-content path found')
             
-            if 'wp-includes' in html_content:
+            if b'wp-includes' in html_bytes:
                 wp_score += 25
                 wp_evidence.append('wp-includes path found')
             
-            wp_meta = soup.find('meta', {'name': 'generator', 'content': re.compile(r'wordpress', re.I)})
+            # Lowercase the (short) generator value once rather than folding case in the regex engine
+            wp_meta = any('wordpress' in (meta.attributes.get('content') or '').lower()
+                          for meta in tree.css('meta[name="generator"]'))
             if wp_meta:
                 wp_score += 40
                 wp_evidence.append('WordPress generator meta tag')
@@ -50,11 +55,14 @@ class CMSDetection:
             shopify_score = 0
             shopify_evidence = []
             
-            if 'shopify' in html_content:
+            # The CDN host contains 'shopify', so finding it answers both checks with one scan
+            has_shopify_cdn = b'cdn.shopify.com' in html_bytes
+            
+            if has_shopify_cdn or b'shopify' in html_bytes:
                 shopify_score += 35
                 shopify_evidence.append('Shopify references found')
             
-            if 'cdn.shopify.com' in html_content:
+            if has_shopify_cdn:
                 shopify_score += 40
                 shopify_evidence.append('Shopify CDN detected')
             
@@ -66,7 +74,7 @@ class CMSDetection:
                 }
             
             # Drupal detection
-            if 'drupal' in html_content:
+            if b'drupal' in html_bytes:
                 detected_systems['Drupal'] = {
                     'confidence': 80,
                     'evidence': ['Drupal references found'],
@@ -74,7 +82,7 @@ class CMSDetection:
                 }
             
             # Joomla detection
-            if 'joomla' in html_content:
+            if b'joomla' in html_bytes:
                 detected_systems['Joomla'] = {
                     'confidence': 80,
                     'evidence': ['Joomla references found'],
@@ -82,7 +90,7 @@ class CMSDetection:
                 }
             
             # Wix detection
-            if 'wix.com' in html_content or 'wixstatic.com' in html_content:
+            if b'wix.com' in html_bytes or b'wixstatic.com' in html_bytes:
                 detected_systems['Wix'] = {
                     'confidence': 90,
                     'evidence': ['Wix platform detected'],
@@ -90,7 +98,7 @@ class CMSDetection:
                 }
             
             # Squarespace detection
-            if 'squarespace' in html_content:
+            if b'squarespace' in html_bytes:
                 detected_systems['Squarespace'] = {
                     'confidence': 85,
                     'evidence': ['Squarespace platform detected'],
@@ -106,15 +114,15 @@ class CMSDetection:
             result = {
                 'primary_cms': primary_cms,
                 'detected_systems': detected_systems,
-                'total_detected': len([cms for cms, data in detected_systems.items() if data['detected']]),
+                'total_detected': sum(1 for data in detected_systems.values() if data['detected']),
                 'analysis_complete': True
             }
             
-            print(f"✅ CMS Detection complete. Primary: {primary_cms}")
+            logger.info(f"✅ CMS Detection complete. Primary: {primary_cms}")
             return result
             
         except Exception as e:
-            print(f"❌ CMS Detection failed: {e}")
+            logger.error(f"❌ CMS Detection failed: {e}")
             return {
                 'primary_cms': None,
                 'detected_systems': {},
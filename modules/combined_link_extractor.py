@@ -1,58 +1,70 @@
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-import concurrent.futures
+import logging
+from urllib.parse import urljoin, urlsplit
+from http_session import shared_session
+from page_fetcher import PageFetcher
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import time
 
+logger = logging.getLogger(__name__)
+
+# hrefs that can never become an http(s) page, rejected before urljoin/urlsplit run
+SKIPPED_HREF_PREFIXES = ('#', 'javascript:', 'mailto:', 'tel:', 'data:', 'blob:')
+HTTP_SCHEMES = frozenset(['http', 'https'])
+# hrefs that are already absolute and can skip urljoin re-parsing the base URL
+ABSOLUTE_HREF_PREFIXES = ('http://', 'https://')
+
+@lru_cache(maxsize=4096)
+def resolve_href(base_url, href):
+    """Return (absolute_url, scheme, netloc) for an href found on base_url"""
+    # Navigation links repeat on every page of a site, so most lookups are cache hits
+    absolute_url = href if href.startswith(ABSOLUTE_HREF_PREFIXES) else urljoin(base_url, href)
+    parsed_url = urlsplit(absolute_url)
+    return absolute_url, parsed_url.scheme, parsed_url.netloc
+
 class CombinedLinkExtractor:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        self.session = shared_session
     
-    def extract_all_links(self, url):
-        """Extract all links using the fastest method available"""
+    def extract_all_links(self, url, tree=None):
+        """Extract all links using the fastest method available
+        
+        tree (the parsed page) can be passed in when the page was already fetched.
+        """
         try:
-            print(f"🚀 Fast link extraction for: {url}")
-            start_time = time.time()
-            
-            # Use requests + BeautifulSoup for speed
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
+            logger.debug("🚀 Fast link extraction for: %s", url)
+            start_time = time.monotonic()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            base_domain = urlparse(url).netloc
+            if tree is None:
+                # Streamed, size-capped download parsed with selectolax
+                tree = PageFetcher(self.session).fetch(url).tree
+            base_domain = urlsplit(url).netloc
             
             internal_links = []
             external_links = []
             
-            # Extract all links in parallel
-            links = soup.find_all('a', href=True)
+            # Nav and footer links repeat the same hrefs, so keep only the first anchor for each
+            unique_anchors = {}
+            for link in tree.css('a[href]'):
+                href = (link.attributes.get('href') or '').strip()
+                if href and href not in unique_anchors:
+                    unique_anchors[href] = link
             
-            with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-                futures = []
-                for link in links:
-                    future = executor.submit(self._process_link, link, url, base_domain)
-                    futures.append(future)
-                
-                for future in concurrent.futures.as_completed(futures):
-                    try:
-                        result = future.result()
-                        if result:
-                            if result['type'] == 'internal':
-                                internal_links.append(result['data'])
-                            else:
-                                external_links.append(result['data'])
-                    except Exception as e:
-                        continue
+            # Per-link work is a few string operations, so a plain loop beats handing links to threads
+            for link in unique_anchors.values():
+                result = self._process_link(link, url, base_domain)
+                if result:
+                    if result['type'] == 'internal':
+                        internal_links.append(result['data'])
+                    else:
+                        external_links.append(result['data'])
             
-            # Remove duplicates
+            # Different hrefs can still resolve to the same URL
             internal_links = self._remove_duplicates(internal_links)
             external_links = self._remove_duplicates(external_links)
             
-            elapsed = time.time() - start_time
-            print(f"⚡ Extracted {len(internal_links)} internal and {len(external_links)} external links in {elapsed:.2f}s")
+            elapsed = time.monotonic() - start_time
+            logger.info("extract %s internal=%d external=%d elapsed=%.3f", url, len(internal_links), len(external_links), elapsed)
             
             return {
                 'internal_links': internal_links,
@@ -62,7 +74,7 @@ class CombinedLinkExtractor:
             }
             
         except Exception as e:
-            print(f"❌ Link extraction failed: {e}")
+            logger.error("❌ Link extraction failed for %s: %s", url, e)
             return {
                 'internal_links': [],
                 'external_links': [],
@@ -70,31 +82,37 @@ class CombinedLinkExtractor:
                 'error': str(e)
             }
     
+    def extract_many(self, urls, max_workers=32):
+        """Extract links from several pages concurrently, returning {url: result}"""
+        # Workers only wait on the network; the shared session's pool keeps their connections alive
+        unique_urls = list(dict.fromkeys(urls))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(unique_urls, executor.map(self.extract_all_links, unique_urls)))
+    
     def _process_link(self, link, base_url, base_domain):
         """Process individual link"""
         try:
-            href = link.get('href', '').strip()
-            if not href or href.startswith('#') or href.startswith('javascript:') or href.startswith('mailto:'):
+            href = (link.attributes.get('href') or '').strip()
+            if not href or href.startswith(SKIPPED_HREF_PREFIXES):
                 return None
             
             # Convert relative URLs to absolute
-            absolute_url = urljoin(base_url, href)
-            parsed_url = urlparse(absolute_url)
+            absolute_url, scheme, netloc = resolve_href(base_url, href)
             
             # Skip non-http protocols
-            if parsed_url.scheme not in ['http', 'https']:
+            if scheme not in HTTP_SCHEMES:
                 return None
             
             link_data = {
                 'url': absolute_url,
-                'text': link.get_text(strip=True)[:100],
-                'title': link.get('title', ''),
-                'rel': link.get('rel', []),
-                'target': link.get('target', '')
+                'text': link.text(strip=True)[:100],
+                'title': link.attributes.get('title') or '',
+                'rel': (link.attributes.get('rel') or '').split(),
+                'target': link.attributes.get('target') or ''
             }
             
             # Determine if internal or external
-            if parsed_url.netloc == base_domain:
+            if netloc == base_domain:
                 return {'type': 'internal', 'data': link_data}
             else:
                 return {'type': 'external', 'data': link_data}
@@ -103,13 +121,8 @@ class CombinedLinkExtractor:
             return None
     
     def _remove_duplicates(self, links):
-        """Remove duplicate links"""
-        seen_urls = set()
-        unique_links = []
-        
+        """Remove duplicate links, keeping the first occurrence of each URL in order"""
+        unique_links = {}
         for link in links:
-            if link['url'] not in seen_urls:
-                seen_urls.add(link['url'])
-                unique_links.append(link)
-        
-        return unique_links
+            unique_links.setdefault(link['url'], link)
+        return list(unique_links.values())
@@ -0,0 +1,287 @@
+import logging
+import time
+import requests
+from urllib.parse import urlparse, urlsplit
+from concurrent.futures import ThreadPoolExecutor
+from http_session import shared_session
+from page_fetcher import PageFetcher
+from lru_cache import LRUCache
+from combined_link_extractor import SKIPPED_HREF_PREFIXES, HTTP_SCHEMES, resolve_href
+
+logger = logging.getLogger(__name__)
+
+BUTTON_SELECTOR = 'button, input[type="button"], input[type="submit"], .btn, [role="button"]'
+VIDEO_SELECTOR = 'video, iframe[src*="youtube"], iframe[src*="vimeo"], iframe[src*="youtu.be"]'
+BANNER_SELECTOR = ('.banner, .hero, .jumbotron, .masthead, .header-banner, '
+                   '[class*="banner"], [class*="hero"], [id*="banner"], [id*="hero"]')
+CAROUSEL_SELECTOR = ('.carousel, .slider, .swiper, .slick, .owl-carousel, [class*="carousel"], '
+                     '[class*="slider"], [class*="swiper"], [data-ride="carousel"], .glide, .splide')
+LABELLED_INPUT_SELECTOR = ('input[type="text"], input[type="email"], input[type="password"], '
+                           'input[type="tel"], textarea, select')
+
+# Matched as substrings of lowercased text; C substring search beats a case-insensitive alternation
+CALCULATOR_KEYWORDS = ('calculat', 'compute', 'estimate', 'rate', 'loan', 'mortgage', 'tax', 'budget', 'cost')
+BANNER_KEYWORDS = ('banner', 'hero', 'header')
+
+# content digest -> (elements, accessibility score, seo score); the scores depend only on the markup
+_page_scores = LRUCache(maxsize=512)
+
+class ElementAnalyzer:
+    """Element counts and SEO/accessibility scores for every internal page linked from a URL"""
+
+    # Page downloads are pure network waits, so they overlap well on threads
+    MAX_WORKERS = 16
+
+    def __init__(self):
+        self.session = shared_session
+
+    def analyze_multiple_pages(self, url, max_links=50):
+        """Analyze up to max_links internal pages linked from url, fetching them concurrently"""
+        try:
+            logger.debug("🔍 Deep analysis for: %s", url)
+            start_time = time.monotonic()
+
+            page_fetcher = PageFetcher(self.session)
+            tree = page_fetcher.fetch(url).tree
+            parsed = urlparse(url)
+            base_url = f"{parsed.scheme}://{parsed.netloc}"
+
+            internal_links = self._extract_internal_links(tree, url)
+            links_to_analyze = internal_links[:max_links]
+            logger.info(f"📋 Found {len(internal_links)} internal links, analyzing {len(links_to_analyze)}")
+
+            analyzed_data = []
+            failed_data = []
+            with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+                for result in executor.map(lambda link: self._analyze_page(page_fetcher, link), links_to_analyze):
+                    if result['status'] == '✅':
+                        analyzed_data.append(result)
+                    else:
+                        failed_data.append(result)
+
+            elapsed = time.monotonic() - start_time
+            logger.info("deep-analysis %s analyzed=%d failed=%d elapsed=%.3f", url, len(analyzed_data), len(failed_data), elapsed)
+
+            return {
+                'base_url': base_url,
+                'url': url,
+                'total_internal_links': len(internal_links),
+                'analyzed_links': len(analyzed_data),
+                'failed_links': len(failed_data),
+                'analyzed_data': analyzed_data,
+                'failed_data': failed_data,
+                'summary': self._summarize(analyzed_data),
+                'processing_time': elapsed,
+                'status': 'completed'
+            }
+
+        except Exception as e:
+            logger.error(f"❌ Deep analysis failed: {e}")
+            return {'error': str(e)}
+
+    def _extract_internal_links(self, tree, url):
+        """Unique same-site links with their text and title, in page order"""
+        base_domain = urlsplit(url).netloc
+        links = []
+        seen = set()
+        for anchor in tree.css('a[href]'):
+            href = (anchor.attributes.get('href') or '').strip()
+            if not href or href.startswith(SKIPPED_HREF_PREFIXES):
+                continue
+
+            # Compare hosts exactly; a prefix check would accept example.com.evil.io
+            full_url, scheme, netloc = resolve_href(url, href)
+            if scheme not in HTTP_SCHEMES or netloc != base_domain or full_url in seen:
+                continue
+
+            seen.add(full_url)
+            links.append({
+                'url': full_url,
+                'text': anchor.text().strip()[:100],
+                'title': (anchor.attributes.get('title') or '')[:100]
+            })
+        return links
+
+    def _analyze_page(self, page_fetcher, link):
+        """Fetch one page and score it; failures are returned rather than raised"""
+        try:
+            page = page_fetcher.fetch(link['url'])
+        except requests.HTTPError as e:
+            return {'url': link['url'], 'text': link['text'], 'error': f"HTTP {e.response.status_code}", 'status': '❌'}
+        except Exception as e:
+            return {'url': link['url'], 'text': link['text'], 'error': str(e), 'status': '❌'}
+
+        # Re-audits and duplicate pages skip parsing and scoring entirely
+        scores = _page_scores.get(page.digest)
+        if scores is None:
+            scores = self._score_page(page.tree)
+            _page_scores.put(page.digest, scores)
+        elements, accessibility_score, seo_score = scores
+        
+        return {
+            'url': link['url'],
+            'text': link['text'],
+            'title': link['title'],
+            'status': '✅',
+            'elements': elements,
+            'accessibility_score': accessibility_score,
+            'seo_score': seo_score
+        }
+
+    def _score_page(self, tree):
+        """Return (elements, accessibility score, seo score) for a parsed page"""
+        # Node lists more than one check needs are collected in a single traversal each
+        images = tree.css('img')
+        h1_tags = tree.css('h1')
+        links = tree.css('a[href]')
+
+        return (
+            self._count_elements(tree, images),
+            self._accessibility_score(tree, images, h1_tags, links),
+            self._seo_score(tree, images, h1_tags, links)
+        )
+
+    def _count_elements(self, tree, images):
+        """Count interactive and content elements on a page"""
+        forms = tree.css('form')
+
+        calculators = 0
+        for form in forms:
+            number_inputs = len(form.css('input[type="number"], input[type="range"]'))
+            if number_inputs >= 2 or self._contains_any(form.text().lower(), CALCULATOR_KEYWORDS):
+                calculators += 1
+
+        banner_images = 0
+        for img in images:
+            attrs = img.attributes
+            if any(self._contains_any((attrs.get(name) or '').lower(), BANNER_KEYWORDS) for name in ('src', 'alt', 'class')):
+                banner_images += 1
+
+        return {
+            'buttons': len(tree.css(BUTTON_SELECTOR)),
+            'forms': len(forms),
+            'images': len(images),
+            'headings': len(tree.css('h1, h2, h3, h4, h5, h6')),
+            'videos': len(tree.css(VIDEO_SELECTOR)),
+            'calculators': calculators,
+            'banners': len(tree.css(BANNER_SELECTOR)) + banner_images,
+            'carousels': len(tree.css(CAROUSEL_SELECTOR))
+        }
+
+    @staticmethod
+    def _contains_any(text, keywords):
+        """True if any keyword occurs in text"""
+        return any(keyword in text for keyword in keywords)
+
+    def _accessibility_score(self, tree, images, h1_tags, links):
+        """Score out of 100 based on alt text, headings, link names, form labels, lang and skip links"""
+        deductions = 0
+
+        if images:
+            without_alt = sum(1 for img in images if not img.attributes.get('alt'))
+            deductions += without_alt / len(images) * 100 * 0.3
+
+        h1_count = len(h1_tags)
+        if h1_count == 0:
+            deductions += 15
+        elif h1_count > 1:
+            deductions += 10
+
+        if links:
+            unnamed = sum(1 for link in links
+                          if not link.text().strip()
+                          and not any(link.attributes.get(name) for name in ('aria-label', 'title', 'aria-labelledby')))
+            deductions += unnamed / len(links) * 100 * 0.2
+
+        inputs = tree.css(LABELLED_INPUT_SELECTOR)
+        if inputs:
+            label_targets = {label.attributes.get('for') for label in tree.css('label[for]')}
+            unlabelled = sum(1 for field in inputs
+                             if field.attributes.get('id') not in label_targets
+                             and not field.attributes.get('aria-label')
+                             and not field.attributes.get('aria-labelledby'))
+            deductions += unlabelled / len(inputs) * 100 * 0.25
+
+        html = tree.css_first('html')
+        if html is None or not html.attributes.get('lang'):
+            deductions += 10
+
+        skip_links = [link for link in links
+                      if (link.attributes.get('href') or '').startswith('#')
+                      and ('skip' in link.text().lower() or 'jump' in link.text().lower())]
+        if not skip_links:
+            deductions += 5
+
+        return max(0, round(100 - deductions))
+
+    def _seo_score(self, tree, images, h1_tags, links):
+        """Score out of 100 based on title, description, headings, alt text and common meta tags"""
+        deductions = 0
+
+        title = tree.css_first('title')
+        title_text = title.text().strip() if title else ''
+        if not title_text:
+            deductions += 20
+        elif len(title_text) < 30 or len(title_text) > 60:
+            deductions += 10
+
+        description = tree.css_first('meta[name="description"]')
+        description_text = (description.attributes.get('content') or '') if description else ''
+        if not description_text:
+            deductions += 15
+        elif len(description_text) < 120 or len(description_text) > 160:
+            deductions += 8
+
+        if not h1_tags:
+            deductions += 15
+        elif len(h1_tags) > 1:
+            deductions += 10
+        elif not 20 <= len(h1_tags[0].text().strip()) <= 70:
+            deductions += 5
+
+        if tree.css_first('h2') is None and tree.css_first('h3, h4') is not None:
+            deductions += 8
+
+        if images:
+            without_alt = sum(1 for img in images if not img.attributes.get('alt'))
+            deductions += without_alt / len(images) * 100 * 0.15
+
+        has_relative_links = any(not (link.attributes.get('href') or '').startswith(('http', 'mailto:', 'tel:'))
+                                 for link in links)
+        if not has_relative_links:
+            deductions += 10
+
+        if tree.css_first('meta[name="viewport"]') is None:
+            deductions += 8
+
+        if tree.css_first('link[rel="canonical"]') is None:
+            deductions += 5
+
+        if tree.css_first('meta[property^="og:"]') is None:
+            deductions += 5
+
+        if tree.css_first('script[type="application/ld+json"]') is None:
+            deductions += 5
+
+        return max(0, round(100 - deductions))
+
+    def _summarize(self, analyzed_data):
+        """Totals and averages across all successfully analyzed pages"""
+        def total(key):
+            return sum(page['elements'][key] for page in analyzed_data)
+
+        count = len(analyzed_data)
+        return {
+            'total_buttons': total('buttons'),
+            'total_forms': total('forms'),
+            'total_images': total('images'),
+            'total_headings': total('headings'),
+            'total_videos': total('videos'),
+            'total_calculators': total('calculators'),
+            'total_banners': total('banners'),
+            'total_carousels': total('carousels'),
+            'average_accessibility_score': sum(page['accessibility_score'] for page in analyzed_data) / count if count else 0,
+            'average_seo_score': sum(page['seo_score'] for page in analyzed_data) / count if count else 0,
+            'pages_with_forms': sum(1 for page in analyzed_data if page['elements']['forms'] > 0),
+            'pages_with_images': sum(1 for page in analyzed_data if page['elements']['images'] > 0)
+        }
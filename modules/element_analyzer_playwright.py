@@ -1,63 +1,100 @@
+import logging
 from playwright.sync_api import sync_playwright
+from browser_scripts import PAGE_SNAPSHOT_JS
 import time
 
+logger = logging.getLogger(__name__)
+
 class ElementAnalyzerPlaywright:
+    USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    # The analysis reads the DOM, not pixels; these downloads only slow the load event down
+    BLOCKED_RESOURCE_TYPES = frozenset(['image', 'media', 'font'])
+    
     def __init__(self):
         self.playwright = None
         self.browser = None
         self.page = None
     
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def start(self):
+        """Launch Chromium once; later analyze_elements calls reuse it"""
+        # The sync API is bound to the thread that started it, so keep one instance per thread
+        if self.browser is None:
+            self.playwright = sync_playwright().start()
+            self.browser = self.playwright.chromium.launch(headless=True)
+        return self
+    
+    def close(self):
+        """Shut down the browser and the Playwright driver"""
+        if self.browser:
+            self.browser.close()
+            self.browser = None
+        if self.playwright:
+            self.playwright.stop()
+            self.playwright = None
+    
     def analyze_elements(self, url):
         """Analyze page elements using Playwright"""
         try:
-            print(f"🔍 Analyzing elements with Playwright: {url}")
+            logger.debug("🔍 Analyzing elements with Playwright: %s", url)
             
-            with sync_playwright() as p:
-                self.browser = p.chromium.launch(headless=True)
-                self.page = self.browser.new_page()
+            self.start()
+            # A fresh context per page keeps cookies and storage isolated without relaunching the browser
+            context = self.browser.new_context(user_agent=self.USER_AGENT)
+            context.route('**/*', self._block_heavy_resources)
+            try:
+                self.page = context.new_page()
                 
-                # Set user agent
-                self.page.set_extra_http_headers({
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                })
+                # 'load' fires once the document and its subresources are in; networkidle adds a 500ms quiet window
+                self.page.goto(url, wait_until='load')
                 
-                self.page.goto(url, wait_until='networkidle')
+                # One evaluate call instead of a CDP round trip per element and attribute
+                snapshot = self.page.evaluate(PAGE_SNAPSHOT_JS)
                 
                 elements_data = {
-                    'page_info': self._get_page_info(),
-                    'headings': self._analyze_headings(),
-                    'images': self._analyze_images(),
-                    'forms': self._analyze_forms(),
-                    'links': self._analyze_links_playwright(),
-                    'meta_tags': self._analyze_meta_tags(),
+                    'page_info': self._get_page_info(snapshot),
+                    'headings': self._analyze_headings(snapshot),
+                    'images': self._analyze_images(snapshot),
+                    'forms': self._analyze_forms(snapshot),
+                    'links': self._analyze_links_playwright(snapshot),
+                    'meta_tags': self._analyze_meta_tags(snapshot),
                     'performance': self._analyze_performance(),
                     'accessibility': self._analyze_accessibility()
                 }
                 
-                print("✅ Playwright element analysis complete")
+                logger.info("✅ Playwright element analysis complete")
                 return elements_data
+            finally:
+                context.close()
+                self.page = None
                 
         except Exception as e:
-            print(f"❌ Playwright analysis failed: {e}")
+            logger.error("❌ Playwright analysis failed: %s", e)
             raise e
-        finally:
-            if self.browser:
-                self.browser.close()
     
-    def _get_page_info(self):
+    def _block_heavy_resources(self, route):
+        """Abort image, media and font requests; let everything else through"""
+        if route.request.resource_type in self.BLOCKED_RESOURCE_TYPES:
+            route.abort()
+        else:
+            route.continue_()
+    
+    def _get_page_info(self, snapshot):
         """Get basic page information"""
         return {
-            'title': self.page.title(),
+            'title': snapshot['title'],
             'url': self.page.url,
             'viewport': self.page.viewport_size
         }
     
-    def _analyze_headings(self):
+    def _analyze_headings(self, snapshot):
         """Analyze heading structure"""
-        headings = {}
-        for i in range(1, 7):
-            elements = self.page.query_selector_all(f'h{i}')
-            headings[f'h{i}'] = [elem.inner_text().strip() for elem in elements if elem.inner_text().strip()]
+        headings = snapshot['headings']
         
         return {
             'structure': headings,
@@ -66,96 +103,61 @@ class ElementAnalyzerPlaywright:
             'multiple_h1': len(headings.get('h1', [])) > 1
         }
     
-    def _analyze_images(self):
+    def _analyze_images(self, snapshot):
         """Analyze images on the page"""
-        images = self.page.query_selector_all('img')
+        total_images = snapshot['imageCount']
         
         image_data = []
         missing_alt = 0
         
-        for img in images[:20]:  # Limit to first 20 images
-            src = img.get_attribute('src')
-            alt = img.get_attribute('alt')
-            
-            if not alt:
+        for img in snapshot['images']:  # The snapshot holds the first 20 images
+            if not img['alt']:
                 missing_alt += 1
             
             image_data.append({
-                'src': src,
-                'alt': alt or '',
-                'width': img.get_attribute('width'),
-                'height': img.get_attribute('height')
+                'src': img['src'],
+                'alt': img['alt'] or '',
+                'width': img['width'],
+                'height': img['height']
             })
         
         return {
-            'total_images': len(images),
+            'total_images': total_images,
             'images_sample': image_data,
             'missing_alt_text': missing_alt,
-            'alt_text_percentage': ((len(images) - missing_alt) / len(images) * 100) if images else 0
+            'alt_text_percentage': ((total_images - missing_alt) / total_images * 100) if total_images else 0
         }
     
-    def _analyze_forms(self):
+    def _analyze_forms(self, snapshot):
         """Analyze forms on the page"""
-        forms = self.page.query_selector_all('form')
-        
-        form_data = []
-        for form in forms:
-            inputs = form.query_selector_all('input')
-            textareas = form.query_selector_all('textarea')
-            selects = form.query_selector_all('select')
-            
-            form_data.append({
-                'action': form.get_attribute('action'),
-                'method': form.get_attribute('method'),
-                'inputs': len(inputs),
-                'textareas': len(textareas),
-                'selects': len(selects)
-            })
+        forms = snapshot['forms']
         
         return {
             'total_forms': len(forms),
-            'forms_details': form_data
+            'forms_details': forms
         }
     
-    def _analyze_links_playwright(self):
+    def _analyze_links_playwright(self, snapshot):
         """Analyze links using Playwright"""
-        links = self.page.query_selector_all('a')
-        
-        internal_count = 0
-        external_count = 0
-        empty_links = 0
-        
-        current_domain = self.page.url.split('/')[2]
-        
-        for link in links:
-            href = link.get_attribute('href')
-            if not href:
-                empty_links += 1
-            elif current_domain in href:
-                internal_count += 1
-            else:
-                external_count += 1
+        # Counted in the page, where each href is resolved and its host compared exactly
+        links = snapshot['links']
         
         return {
-            'total_links': len(links),
-            'internal_links': internal_count,
-            'external_links': external_count,
-            'empty_links': empty_links
+            'total_links': links['total'],
+            'internal_links': links['internal'],
+            'external_links': links['external'],
+            'empty_links': links['empty']
         }
     
-    def _analyze_meta_tags(self):
+    def _analyze_meta_tags(self, snapshot):
         """Analyze meta tags"""
-        meta_tags = self.page.query_selector_all('meta')
-        
         meta_data = {}
-        for meta in meta_tags:
-            name = meta.get_attribute('name') or meta.get_attribute('property')
-            content = meta.get_attribute('content')
+        for name, content in snapshot['meta']:
             if name and content:
                 meta_data[name] = content
         
         return {
-            'total_meta_tags': len(meta_tags),
+            'total_meta_tags': len(snapshot['meta']),
             'important_tags': {
                 'description': meta_data.get('description', ''),
                 'keywords': meta_data.get('keywords', ''),
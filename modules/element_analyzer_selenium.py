@@ -1,16 +1,43 @@
+import logging
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
+from browser_scripts import PAGE_SNAPSHOT_JS, SELENIUM_METRICS_JS
+from functools import lru_cache
 import time
 
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=None)
+def chromedriver_path():
+    """Install or locate ChromeDriver once per process; the version check goes over the network"""
+    return ChromeDriverManager().install()
+
 class ElementAnalyzerSelenium:
     def __init__(self):
         self.driver = None
     
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def start(self):
+        """Start headless Chrome once; later analyze_elements calls reuse it"""
+        if self.driver is None and not self._setup_driver():
+            raise Exception("Failed to setup Selenium driver")
+        return self
+    
+    def close(self):
+        """Quit the browser"""
+        if self.driver:
+            self.driver.quit()
+            self.driver = None
+    
     def _setup_driver(self):
         """Setup Chrome driver with options"""
         try:
@@ -21,65 +48,84 @@ class ElementAnalyzerSelenium:
             chrome_options.add_argument('--disable-gpu')
             chrome_options.add_argument('--window-size=1920,1080')
             chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
+            # Images are analyzed from their attributes, so there's no need to download them
+            chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+            chrome_options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
             
-            service = Service(ChromeDriverManager().install())
+            service = Service(chromedriver_path())
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
             return True
         except Exception as e:
-            print(f"❌ Failed to setup Chrome driver: {e}")
+            logger.error("❌ Failed to setup Chrome driver: %s", e)
             return False
     
     def analyze_elements(self, url):
         """Analyze page elements using Selenium"""
-        if not self._setup_driver():
-            raise Exception("Failed to setup Selenium driver")
+        self.start()
         
         try:
-            print(f"🔍 Analyzing elements with Selenium: {url}")
+            logger.debug("🔍 Analyzing elements with Selenium: %s", url)
             
             self.driver.get(url)
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
+            self._wait_until_settled()
             
-            # Wait for page to load completely
-            time.sleep(2)
+            # A single WebDriver command returns everything the helpers below need
+            snapshot = self.driver.execute_script(
+                "return Object.assign((" + PAGE_SNAPSHOT_JS + ")(true), (" + SELENIUM_METRICS_JS + ")());"
+            )
             
             elements_data = {
-                'page_info': self._get_page_info(),
-                'headings': self._analyze_headings(),
-                'images': self._analyze_images(),
-                'forms': self._analyze_forms(),
-                'links': self._analyze_links_selenium(),
-                'meta_tags': self._analyze_meta_tags(),
-                'performance': self._analyze_performance(),
-                'accessibility': self._analyze_accessibility()
+                'page_info': self._get_page_info(snapshot),
+                'headings': self._analyze_headings(snapshot),
+                'images': self._analyze_images(snapshot),
+                'forms': self._analyze_forms(snapshot),
+                'links': self._analyze_links_selenium(snapshot),
+                'meta_tags': self._analyze_meta_tags(snapshot),
+                'performance': self._analyze_performance(snapshot),
+                'accessibility': self._analyze_accessibility(snapshot)
             }
             
-            print("✅ Selenium element analysis complete")
+            logger.info("✅ Selenium element analysis complete")
             return elements_data
             
         except Exception as e:
-            print(f"❌ Selenium analysis failed: {e}")
+            logger.error("❌ Selenium analysis failed: %s", e)
             raise e
-        finally:
-            if self.driver:
-                self.driver.quit()
     
-    def _get_page_info(self):
+    def _wait_until_settled(self, timeout=10, quiet_period=0.5):
+        """Wait for the load to finish, then for the page to stop requesting resources for quiet_period seconds"""
+        WebDriverWait(self.driver, timeout).until(
+            lambda driver: driver.execute_script("return document.readyState") == 'complete'
+        )
+        
+        # Client-rendered pages keep fetching after the load event; treat a steady resource count as settled
+        last = {'count': -1, 'since': time.monotonic()}
+        
+        def resources_quiet(driver):
+            count = driver.execute_script("return performance.getEntriesByType('resource').length")
+            now = time.monotonic()
+            if count != last['count']:
+                last['count'], last['since'] = count, now
+                return False
+            return now - last['since'] >= quiet_period
+        
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(resources_quiet)
+        except TimeoutException:
+            # Pages that poll forever never go quiet; analyze what has rendered so far
+            logger.warning("⚠️ Page still loading resources after %ss, analyzing current state", timeout)
+    
+    def _get_page_info(self, snapshot):
         """Get basic page information"""
         return {
-            'title': self.driver.title,
-            'url': self.driver.current_url,
-            'page_source_length': len(self.driver.page_source)
+            'title': snapshot['title'],
+            'url': snapshot['url'],
+            'page_source_length': snapshot['pageSourceLength']
         }
     
-    def _analyze_headings(self):
+    def _analyze_headings(self, snapshot):
         """Analyze heading structure"""
-        headings = {}
-        for i in range(1, 7):
-            elements = self.driver.find_elements(By.TAG_NAME, f'h{i}')
-            headings[f'h{i}'] = [elem.text.strip() for elem in elements if elem.text.strip()]
+        headings = snapshot['headings']
         
         return {
             'structure': headings,
@@ -88,96 +134,61 @@ class ElementAnalyzerSelenium:
             'multiple_h1': len(headings.get('h1', [])) > 1
         }
     
-    def _analyze_images(self):
+    def _analyze_images(self, snapshot):
         """Analyze images on the page"""
-        images = self.driver.find_elements(By.TAG_NAME, 'img')
+        total_images = snapshot['imageCount']
         
         image_data = []
         missing_alt = 0
         
-        for img in images[:20]:  # Limit to first 20 images
-            src = img.get_attribute('src')
-            alt = img.get_attribute('alt')
-            
-            if not alt:
+        for img in snapshot['images']:  # The snapshot holds the first 20 images
+            if not img['alt']:
                 missing_alt += 1
             
             image_data.append({
-                'src': src,
-                'alt': alt or '',
-                'width': img.get_attribute('width'),
-                'height': img.get_attribute('height')
+                'src': img['src'],
+                'alt': img['alt'] or '',
+                'width': img['width'],
+                'height': img['height']
             })
         
         return {
-            'total_images': len(images),
+            'total_images': total_images,
             'images_sample': image_data,
             'missing_alt_text': missing_alt,
-            'alt_text_percentage': ((len(images) - missing_alt) / len(images) * 100) if images else 0
+            'alt_text_percentage': ((total_images - missing_alt) / total_images * 100) if total_images else 0
         }
     
-    def _analyze_forms(self):
+    def _analyze_forms(self, snapshot):
         """Analyze forms on the page"""
-        forms = self.driver.find_elements(By.TAG_NAME, 'form')
-        
-        form_data = []
-        for form in forms:
-            inputs = form.find_elements(By.TAG_NAME, 'input')
-            textareas = form.find_elements(By.TAG_NAME, 'textarea')
-            selects = form.find_elements(By.TAG_NAME, 'select')
-            
-            form_data.append({
-                'action': form.get_attribute('action'),
-                'method': form.get_attribute('method'),
-                'inputs': len(inputs),
-                'textareas': len(textareas),
-                'selects': len(selects)
-            })
+        forms = snapshot['forms']
         
         return {
             'total_forms': len(forms),
-            'forms_details': form_data
+            'forms_details': forms
         }
     
-    def _analyze_links_selenium(self):
+    def _analyze_links_selenium(self, snapshot):
         """Analyze links using Selenium"""
-        links = self.driver.find_elements(By.TAG_NAME, 'a')
-        
-        internal_count = 0
-        external_count = 0
-        empty_links = 0
-        
-        current_domain = self.driver.current_url.split('/')[2]
-        
-        for link in links:
-            href = link.get_attribute('href')
-            if not href:
-                empty_links += 1
-            elif current_domain in href:
-                internal_count += 1
-            else:
-                external_count += 1
+        # Counted in the page, where each href is resolved and its host compared exactly
+        links = snapshot['links']
         
         return {
-            'total_links': len(links),
-            'internal_links': internal_count,
-            'external_links': external_count,
-            'empty_links': empty_links
+            'total_links': links['total'],
+            'internal_links': links['internal'],
+            'external_links': links['external'],
+            'empty_links': links['empty']
         }
     
-    def _analyze_meta_tags(self):
+    def _analyze_meta_tags(self, snapshot):
         """Analyze meta tags"""
-        meta_tags = self.driver.find_elements(By.TAG_NAME, 'meta')
-        
         meta_data = {}
-        for meta in meta_tags:
-            name = meta.get_attribute('name') or meta.get_attribute('property')
-            content = meta.get_attribute('content')
+        for name, content in snapshot['meta']:
             if name and content:
                 meta_data[name] = content
         
         return {
-            'total_meta_tags': len(meta_tags),
+            'total_meta_tags': len(snapshot['meta']),
             'important_tags': {
                 'description': meta_data.get('description', ''),
                 'keywords': meta_data.get('keywords', ''),
@@ -186,35 +197,30 @@ class ElementAnalyzerSelenium:
             }
         }
     
-    def _analyze_performance(self):
+    def _analyze_performance(self, snapshot):
         """Basic performance analysis"""
-        try:
-            # Get page load time
-            navigation_start = self.driver.execute_script("return window.performance.timing.navigationStart")
-            load_complete = self.driver.execute_script("return window.performance.timing.loadEventEnd")
-            
-            load_time = (load_complete - navigation_start) / 1000 if load_complete > 0 else 0
-            
-            return {
-                'page_load_time': load_time,
-                'dom_elements': len(self.driver.find_elements(By.XPATH, "//*")),
-                'scripts': len(self.driver.find_elements(By.TAG_NAME, 'script')),
-                'stylesheets': len(self.driver.find_elements(By.TAG_NAME, 'link'))
-            }
-        except:
+        metrics = snapshot['performance']
+        if not metrics:
             return {'error': 'Performance data unavailable'}
+        
+        load_complete = metrics['loadEventEnd']
+        load_time = (load_complete - metrics['navigationStart']) / 1000 if load_complete > 0 else 0
+        
+        return {
+            'page_load_time': load_time,
+            'dom_elements': metrics['domElements'],
+            'scripts': metrics['scripts'],
+            'stylesheets': metrics['links']
+        }
     
-    def _analyze_accessibility(self):
+    def _analyze_accessibility(self, snapshot):
         """Basic accessibility analysis"""
-        try:
-            # Check for common accessibility issues
-            images_without_alt = len(self.driver.find_elements(By.XPATH, "//img[not(@alt) or @alt='']"))
-            links_without_text = len(self.driver.find_elements(By.XPATH, "//a[not(text()) and not(@aria-label) and not(@title)]"))
-            
-            return {
-                'images_without_alt': images_without_alt,
-                'links_without_text': links_without_text,
-                'has_skip_links': len(self.driver.find_elements(By.XPATH, "//a[contains(@href, '#') and (contains(text(), 'skip') or contains(@class, 'skip'))]")) > 0
-            }
-        except:
+        checks = snapshot['accessibility']
+        if not checks:
             return {'error': 'Accessibility analysis unavailable'}
+        
+        return {
+            'images_without_alt': int(checks['imagesWithoutAlt']),
+            'links_without_text': int(checks['linksWithoutText']),
+            'has_skip_links': checks['skipLinks'] > 0
+        }
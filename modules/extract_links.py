@@ -1,60 +1,61 @@
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+import logging
+from urllib.parse import urlsplit
+from http_session import shared_session
+from page_fetcher import PageFetcher
+from combined_link_extractor import SKIPPED_HREF_PREFIXES, HTTP_SCHEMES, resolve_href
 import time
 
+logger = logging.getLogger(__name__)
+
 class LinkExtractor:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        self.session = shared_session
     
     def get_all_links(self, url, timeout=10):
         """Extract all links from a webpage"""
         try:
-            print(f"🔗 Extracting links from: {url}")
-            start_time = time.time()
-            
-            response = self.session.get(url, timeout=timeout)
-            response.raise_for_status()
+            logger.debug("🔗 Extracting links from: %s", url)
+            start_time = time.monotonic()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            base_domain = urlparse(url).netloc
+            tree = PageFetcher(self.session, timeout=timeout).fetch(url).tree
+            base_domain = urlsplit(url).netloc
             
             internal_links = []
             external_links = []
+            seen_internal = set()
+            seen_external = set()
             
             # Find all links
-            for link in soup.find_all('a', href=True):
-                href = link.get('href', '').strip()
-                if not href or href.startswith('#') or href.startswith('javascript:'):
+            for link in tree.css('a[href]'):
+                href = (link.attributes.get('href') or '').strip()
+                if not href or href.startswith(SKIPPED_HREF_PREFIXES):
                     continue
                 
                 # Convert relative URLs to absolute
-                absolute_url = urljoin(url, href)
-                parsed_url = urlparse(absolute_url)
+                absolute_url, scheme, netloc = resolve_href(url, href)
                 
                 # Skip non-http protocols
-                if parsed_url.scheme not in ['http', 'https']:
+                if scheme not in HTTP_SCHEMES:
                     continue
                 
                 link_data = {
                     'url': absolute_url,
-                    'text': link.get_text(strip=True)[:100],
-                    'title': link.get('title', ''),
+                    'text': link.text(strip=True)[:100],
+                    'title': link.attributes.get('title') or '',
                 }
                 
                 # Categorize as internal or external
-                if parsed_url.netloc == base_domain:
-                    if absolute_url not in [l['url'] for l in internal_links]:
+                if netloc == base_domain:
+                    if absolute_url not in seen_internal:
+                        seen_internal.add(absolute_url)
                         internal_links.append(link_data)
                 else:
-                    if absolute_url not in [l['url'] for l in external_links]:
+                    if absolute_url not in seen_external:
+                        seen_external.add(absolute_url)
                         external_links.append(link_data)
             
-            elapsed = time.time() - start_time
-            print(f"✅ Found {len(internal_links)} internal and {len(external_links)} external links in {elapsed:.2f}s")
+            elapsed = time.monotonic() - start_time
+            logger.info("quick-extract %s internal=%d external=%d elapsed=%.3f", url, len(internal_links), len(external_links), elapsed)
             
             return {
                 'internal_links': internal_links,
@@ -64,5 +65,5 @@ class LinkExtractor:
             }
             
         except Exception as e:
-            print(f"❌ Error extracting links: {e}")
+            logger.error("❌ Error extracting links from %s: %s", url, e)
             return {'internal_links': [], 'external_links': [], 'total_links': 0, 'error': str(e)}
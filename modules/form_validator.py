@@ -1,55 +1,124 @@
 import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse, urlunparse
+from urllib3.util.request import ACCEPT_ENCODING
+from selectolax.lexbor import LexborHTMLParser
+from urllib.parse import urlparse, urlsplit, urlunparse
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import re
 from datetime import datetime
 import logging
 from typing import List, Dict, Any, Optional, Tuple
 import json
 import random
+from collections import Counter
+from http_session import create_session, RETRY_STATUSES
+from combined_link_extractor import SKIPPED_HREF_PREFIXES, HTTP_SCHEMES, resolve_href
+from rate_limiter import HostRateLimiter
+from lru_cache import LRUCache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Rotate between different user agents
+USER_AGENTS = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:120.0) Gecko/20100101 Firefox/120.0',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+)
+MOBILE_USER_AGENT = 'Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1'
+
+# Browser-like headers sent with every fetch; User-Agent and Accept-Language are varied per request
+BASE_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+    # Only advertise encodings urllib3 can decode; 'br' needs the optional brotli package
+    'Accept-Encoding': ACCEPT_ENCODING,
+    'Cache-Control': 'no-cache',
+    'Pragma': 'no-cache',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Sec-Fetch-User': '?1',
+    'DNT': '1'
+}
+
+# Tried in order; each is retried max_retries times with its delay growing per attempt
+FETCH_STRATEGIES = (
+    {'name': 'Standard', 'delay': 1},
+    {'name': 'Slow', 'delay': 3},
+    {'name': 'Mobile', 'delay': 2, 'mobile': True}
+)
+
+# Forms sit well inside the first part of a page; the rest of a huge body is never downloaded
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+
+# Links to these files can't contain forms, so they are never queued for analysis
+NON_HTML_EXTENSIONS = (
+    '.pdf', '.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp', '.ico', '.css', '.js', '.xml', '.json',
+    '.zip', '.gz', '.rar', '.mp3', '.mp4', '.webm', '.mov', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx'
+)
+
+# field_counts bucket for each input type; None means the input isn't a field the user fills in.
+# Types missing from the table count as other_inputs.
+INPUT_TYPE_BUCKETS = {
+    'submit': None, 'button': None, 'reset': None, 'hidden': None,
+    'text': 'text_inputs', 'email': 'text_inputs', 'password': 'text_inputs', 'tel': 'text_inputs',
+    'url': 'text_inputs', 'search': 'text_inputs', 'number': 'text_inputs', 'date': 'text_inputs',
+    'time': 'text_inputs', 'datetime-local': 'text_inputs', 'month': 'text_inputs', 'week': 'text_inputs',
+    'checkbox': 'checkboxes',
+    'radio': 'radios',
+    'file': 'file_inputs'
+}
+
+# Attributes that mean a field is validated by the browser
+VALIDATION_ATTRIBUTES = frozenset(['required', 'pattern', 'minlength', 'maxlength', 'min', 'max'])
+
+# Form types in priority order; the first type with a keyword anywhere in the form wins.
+# Substring checks run in C and beat a single re alternation over the same keywords.
+# Needles are bytes so the haystack can be lowercased without Unicode case tables.
+FORM_TYPE_KEYWORDS = (
+    ((b'login', b'signin', b'sign in', b'log in', b'username', b'password'), 'Login Form'),
+    ((b'register', b'signup', b'sign up', b'create account', b'join us'), 'Registration Form'),
+    ((b'contact', b'message', b'inquiry', b'get in touch', b'reach out'), 'Contact Form'),
+    ((b'search', b'query', b'find', b'lookup', b'search for'), 'Search Form'),
+    ((b'subscribe', b'newsletter', b'email updates', b'mailing list'), 'Newsletter Form'),
+    ((b'payment', b'checkout', b'billing', b'credit card', b'pay now'), 'Payment Form'),
+    ((b'feedback', b'review', b'rating', b'comment', b'testimonial'), 'Feedback Form'),
+    ((b'quote', b'estimate', b'calculate', b'calculator', b'pricing'), 'Quote/Calculator Form'),
+    ((b'booking', b'reservation', b'appointment', b'schedule', b'book now'), 'Booking Form'),
+    ((b'application', b'apply', b'job', b'career', b'resume'), 'Application Form'),
+    ((b'survey', b'poll', b'questionnaire', b'research'), 'Survey Form')
+)
+
 class FormValidator:
     def __init__(self):
-        self.session = requests.Session()
+        # Pages of one site are fetched over a few pooled keep-alive connections; urllib3 backs off on 429 and 5xx
+        self.session = create_session(pool_connections=64, pool_maxsize=64, retries=3, backoff_factor=0.5,
+                                      status_forcelist=(429,) + RETRY_STATUSES)
         
-        # Rotate between different user agents
-        self.user_agents = [
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:120.0) Gecko/20100101 Firefox/120.0',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15',
-            'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        ]
+        self.user_agents = USER_AGENTS
         
         self.timeout = 15
         self.max_retries = 3
         self.request_delay = 2  # Delay between requests
+        self.max_workers = 8  # Pages analyzed concurrently
+        self.max_requests_per_host = 4  # Page fetches allowed in flight against one host
+        # Requests to one host are spaced request_delay to twice that apart; other hosts proceed in parallel
+        self.rate_limiter = HostRateLimiter(self.request_delay, self.request_delay * 2)
+        # Successful fetches by URL; the main page is fetched for link discovery and analyzed again as page 1
+        self._page_cache = LRUCache(maxsize=128)
         
     def _get_random_headers(self) -> Dict[str, str]:
         """Generate random headers to avoid detection"""
-        user_agent = random.choice(self.user_agents)
-        
-        headers = {
-            'User-Agent': user_agent,
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Cache-Control': 'no-cache',
-            'Pragma': 'no-cache',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Sec-Fetch-User': '?1',
-            'DNT': '1'
-        }
+        # A copy, since the caller may swap in the mobile User-Agent
+        headers = dict(BASE_HEADERS)
+        headers['User-Agent'] = random.choice(self.user_agents)
         
         # Add some randomization
         if random.random() > 0.5:
@@ -59,7 +128,7 @@ class FormValidator:
         
     def validate_forms(self, base_url: str, max_pages: int = 20) -> Dict[str, Any]:
         """Main method to validate forms across a website with anti-detection measures"""
-        start_time = time.time()
+        start_time = time.monotonic()
         logger.info(f"🔍 Starting stealth form validation for: {base_url}")
         
         try:
@@ -89,7 +158,7 @@ class FormValidator:
             analysis_results = self._analyze_pages_stealth(all_pages)
             
             # Step 6: Generate results
-            processing_time = time.time() - start_time
+            processing_time = time.monotonic() - start_time
             result = self._generate_final_result(
                 normalized_url, 
                 all_pages, 
@@ -124,24 +193,19 @@ class FormValidator:
     
     def _fetch_page_stealth(self, url: str) -> Optional[str]:
         """Fetch page with stealth techniques to avoid detection"""
+        cached = self._page_cache.get(url)
+        if cached is not None:
+            return cached
         
-        strategies = [
-            {'name': 'Standard', 'delay': 1},
-            {'name': 'Slow', 'delay': 3},
-            {'name': 'Mobile', 'delay': 2, 'mobile': True}
-        ]
-        
-        for strategy in strategies:
+        for strategy in FETCH_STRATEGIES:
             for attempt in range(self.max_retries):
                 try:
                     logger.info(f"🕵️ Stealth fetch attempt {attempt + 1} using {strategy['name']} strategy")
                     
-                    # Update session headers
+                    # Headers are sent per request; the session is shared by the page workers
                     headers = self._get_random_headers()
                     if strategy.get('mobile'):
-                        headers['User-Agent'] = 'Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1'
-                    
-                    self.session.headers.update(headers)
+                        headers['User-Agent'] = MOBILE_USER_AGENT
                     
                     # Add delay to appear more human-like
                     if attempt > 0:
@@ -149,26 +213,43 @@ class FormValidator:
                         logger.info(f"⏳ Waiting {delay}s before retry...")
                         time.sleep(delay)
                     
+                    waited = self.rate_limiter.wait(url)
+                    if waited > 0:
+                        logger.info(f"⏳ Waited {waited:.1f}s for {urlsplit(url).netloc} before requesting")
+                    
                     # Make request with timeout
                     response = self.session.get(
                         url, 
+                        headers=headers,
                         timeout=self.timeout,
                         allow_redirects=True,
-                        verify=True
+                        verify=True,
+                        stream=True
                     )
                     
-                    # Check response
-                    if response.status_code == 200:
-                        content = response.text
-                        if len(content) > 200 and '<html' in content.lower():
-                            logger.info(f"✅ Stealth fetch successful with {strategy['name']} strategy")
-                            return content
-                    elif response.status_code == 403:
-                        logger.warning(f"⚠️ 403 Forbidden with {strategy['name']} strategy")
-                        continue
-                    else:
-                        logger.warning(f"⚠️ HTTP {response.status_code} with {strategy['name']} strategy")
-                        continue
+                    # Streamed, so the connection goes back to the pool only once the response is closed
+                    try:
+                        # Check response
+                        if response.status_code == 200:
+                            # Files served without a telltale extension are caught by their headers, before the body is read
+                            content_type = response.headers.get('Content-Type', '')
+                            if content_type and 'html' not in content_type.lower():
+                                logger.info(f"⏭️ Skipping non-HTML response ({content_type})")
+                                return None
+                            
+                            content = self._read_text(response)
+                            if len(content) > 200 and '<html' in content.lower():
+                                logger.info(f"✅ Stealth fetch successful with {strategy['name']} strategy")
+                                self._page_cache.put(url, content)
+                                return content
+                        elif response.status_code == 403:
+                            logger.warning(f"⚠️ 403 Forbidden with {strategy['name']} strategy")
+                            continue
+                        else:
+                            logger.warning(f"⚠️ HTTP {response.status_code} with {strategy['name']} strategy")
+                            continue
+                    finally:
+                        response.close()
                         
                 except requests.exceptions.Timeout:
                     logger.warning(f"⏰ Timeout with {strategy['name']} strategy")
@@ -183,32 +264,50 @@ class FormValidator:
         logger.error("❌ All stealth fetch strategies failed")
         return None
     
+    def _read_text(self, response) -> str:
+        """Decode at most MAX_PAGE_BYTES of a streamed response body"""
+        chunks = []
+        size = 0
+        for chunk in response.iter_content(chunk_size=65536):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= MAX_PAGE_BYTES:
+                logger.warning(f"⚠️ {response.url} is larger than {MAX_PAGE_BYTES} bytes, analyzing the first part only")
+                break
+        
+        body = b''.join(chunks)[:MAX_PAGE_BYTES]
+        try:
+            return body.decode(response.encoding or 'utf-8', errors='replace')
+        except LookupError:
+            return body.decode('utf-8', errors='replace')
+    
     def _extract_internal_links_safe(self, html: str, base_url: str) -> List[Dict[str, str]]:
         """Safely extract internal links with error handling"""
         links = []
-        base_domain = urlparse(base_url).netloc.lower()
-        seen_urls = set()
+        base_domain = urlsplit(base_url).netloc.lower()
+        seen_urls = set()  # Absolute URLs without their fragment: /page#a and /page#b are one page
         
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            tree = LexborHTMLParser(html)
             
-            for link_tag in soup.find_all('a', href=True):
+            for link_tag in tree.css('a[href]'):
                 try:
-                    href = link_tag.get('href', '').strip()
-                    if not href or href.startswith(('#', 'javascript:', 'mailto:', 'tel:')):
+                    href = (link_tag.attributes.get('href') or '').strip()
+                    if not href or href.startswith(SKIPPED_HREF_PREFIXES):
                         continue
                     
-                    absolute_url = urljoin(base_url, href)
-                    parsed_url = urlparse(absolute_url)
+                    absolute_url, scheme, netloc = resolve_href(base_url, href)
+                    page_key = absolute_url.partition('#')[0]
                     
-                    if (parsed_url.scheme in ['http', 'https'] and 
-                        parsed_url.netloc.lower() == base_domain and
-                        absolute_url not in seen_urls):
+                    if (scheme in HTTP_SCHEMES and 
+                        netloc.lower() == base_domain and
+                        page_key not in seen_urls and
+                        not urlsplit(page_key).path.lower().endswith(NON_HTML_EXTENSIONS)):
                         
-                        seen_urls.add(absolute_url)
+                        seen_urls.add(page_key)
                         
-                        link_text = link_tag.get_text(strip=True)[:100] or "No text"
-                        title = link_tag.get('title', '')[:100]
+                        link_text = link_tag.text(strip=True)[:100] or "No text"
+                        title = (link_tag.attributes.get('title') or '')[:100]
                         
                         links.append({
                             'url': absolute_url,
@@ -228,34 +327,36 @@ class FormValidator:
             return []
     
     def _analyze_pages_stealth(self, pages: List[Dict[str, str]]) -> Dict[str, List]:
-        """Analyze pages with stealth techniques and rate limiting"""
+        """Analyze pages concurrently, with a per-host cap; the rate limiter spaces out request starts per host"""
         successful = []
         failed = []
         
-        for i, page in enumerate(pages):
-            try:
-                logger.info(f"🔍 Analyzing page {i+1}/{len(pages)}: {page['url']}")
-                
-                # Add delay between requests to avoid rate limiting
-                if i > 0:
-                    delay = random.uniform(self.request_delay, self.request_delay * 2)
-                    logger.info(f"⏳ Waiting {delay:.1f}s before next request...")
-                    time.sleep(delay)
-                
-                result = self._analyze_single_page_stealth(page)
-                
-                if result and result.get('forms_with_multiple_inputs', 0) > 0:
+        # Crawled links all share the start page's host, so the semaphore caps how many of its pages are in flight
+        host_slots = {urlsplit(page['url']).netloc: threading.Semaphore(self.max_requests_per_host) for page in pages}
+        
+        def analyze(indexed_page):
+            i, page = indexed_page
+            with host_slots[urlsplit(page['url']).netloc]:
+                try:
+                    logger.info(f"🔍 Analyzing page {i+1}/{len(pages)}: {page['url']}")
+                    return page, self._analyze_single_page_stealth(page), None
+                except Exception as e:
+                    return page, None, e
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # map yields in page order, so results are reported in the order links were found
+            for page, result, error in executor.map(analyze, enumerate(pages)):
+                if error is not None:
+                    logger.error(f"❌ Failed to analyze {page['url']}: {error}")
+                    failed.append({
+                        'url': page['url'],
+                        'text': page.get('text', ''),
+                        'status': '❌',
+                        'error': str(error)
+                    })
+                elif result and result.get('forms_with_multiple_inputs', 0) > 0:
                     successful.append(result)
                     logger.info(f"✅ Found {result['forms_with_multiple_inputs']} qualifying forms")
-                
-            except Exception as e:
-                logger.error(f"❌ Failed to analyze {page['url']}: {e}")
-                failed.append({
-                    'url': page['url'],
-                    'text': page.get('text', ''),
-                    'status': '❌',
-                    'error': str(e)
-                })
         
         return {'successful': successful, 'failed': failed}
     
@@ -268,8 +369,8 @@ class FormValidator:
             if not content:
                 return None
             
-            soup = BeautifulSoup(content, 'html.parser')
-            forms = soup.find_all('form')
+            tree = LexborHTMLParser(content)
+            forms = tree.css('form')
             
             if not forms:
                 return None
@@ -283,8 +384,8 @@ class FormValidator:
                     qualifying_forms.append(form_analysis)
             
             if qualifying_forms:
-                page_title = soup.find('title')
-                page_title_text = page_title.get_text(strip=True) if page_title else "No title"
+                page_title = tree.css_first('title')
+                page_title_text = page_title.text(strip=True) if page_title else "No title"
                 
                 return {
                     'url': url,
@@ -307,9 +408,9 @@ class FormValidator:
         """Comprehensive form analysis"""
         
         # Count input fields by type
-        inputs = form.find_all('input')
-        textareas = form.find_all('textarea')
-        selects = form.find_all('select')
+        inputs = form.css('input')
+        textareas = form.css('textarea')
+        selects = form.css('select')
         
         field_counts = {
             'text_inputs': 0,
@@ -323,50 +424,40 @@ class FormValidator:
         
         # Analyze input types
         for inp in inputs:
-            input_type = inp.get('type', 'text').lower()
-            
-            if input_type in ['submit', 'button', 'reset', 'hidden']:
-                continue
-            elif input_type in ['text', 'email', 'password', 'tel', 'url', 'search', 'number', 'date', 'time', 'datetime-local', 'month', 'week']:
-                field_counts['text_inputs'] += 1
-            elif input_type == 'checkbox':
-                field_counts['checkboxes'] += 1
-            elif input_type == 'radio':
-                field_counts['radios'] += 1
-            elif input_type == 'file':
-                field_counts['file_inputs'] += 1
-            else:
-                field_counts['other_inputs'] += 1
+            bucket = INPUT_TYPE_BUCKETS.get((inp.attributes.get('type') or 'text').lower(), 'other_inputs')
+            if bucket:
+                field_counts[bucket] += 1
         
         total_fields = sum(field_counts.values())
         
         # Extract form metadata
-        action = form.get('action', '')
-        method = form.get('method', 'GET').upper()
-        form_id = form.get('id', '')
-        form_class = ' '.join(form.get('class', []) if isinstance(form.get('class'), list) else [form.get('class', '')])
+        attributes = form.attributes
+        action = attributes.get('action') or ''
+        method = (attributes.get('method') or 'GET').upper()
+        form_id = attributes.get('id') or ''
+        form_class = ' '.join((attributes.get('class') or '').split())
         
         # Collect labels and placeholders
         labels = []
         placeholders = []
         
-        for label in form.find_all('label'):
-            label_text = label.get_text(strip=True)
+        for label in form.css('label'):
+            label_text = label.text(strip=True)
             if label_text and len(label_text) < 100:
                 labels.append(label_text)
         
-        for element in form.find_all(['input', 'textarea'], placeholder=True):
-            placeholder = element.get('placeholder', '').strip()
+        for element in form.css('input[placeholder], textarea[placeholder]'):
+            placeholder = (element.attributes.get('placeholder') or '').strip()
             if placeholder and len(placeholder) < 100:
                 placeholders.append(placeholder)
         
-        # Classify form type
-        form_type = self._classify_form_type_advanced(form, labels, placeholders)
+        # Classify form type; the markup is serialized once per form
+        form_text = ' '.join(labels + placeholders).encode().lower()
+        form_type = self._classify_form_type_advanced(form.html.encode().lower(), form_text)
         
         # Check for validation
-        has_validation = bool(form.find_all(['input', 'textarea', 'select'], attrs={
-            lambda key, value: key in ['required', 'pattern', 'minlength', 'maxlength', 'min', 'max'] and value is not None
-        }))
+        has_validation = any(not VALIDATION_ATTRIBUTES.isdisjoint(field.attributes)
+                             for field in (*inputs, *textareas, *selects))
         
         return {
             'form_index': form_index,
@@ -383,27 +474,12 @@ class FormValidator:
             'placeholders': placeholders[:10]
         }
     
-    def _classify_form_type_advanced(self, form, labels: List[str], placeholders: List[str]) -> str:
-        """Advanced form type classification"""
-        
-        form_html = str(form).lower()
-        all_text = form_html + ' ' + ' '.join(labels).lower() + ' ' + ' '.join(placeholders).lower()
-        
-        patterns = [
-            (['login', 'signin', 'sign in', 'log in', 'username', 'password'], 'Login Form'),
-            (['register', 'signup', 'sign up', 'create account', 'join us'], 'Registration Form'),
-            (['contact', 'message', 'inquiry', 'get in touch', 'reach out'], 'Contact Form'),
-            (['search', 'query', 'find', 'lookup', 'search for'], 'Search Form'),
-            (['subscribe', 'newsletter', 'email updates', 'mailing list'], 'Newsletter Form'),
-            (['payment', 'checkout', 'billing', 'credit card', 'pay now'], 'Payment Form'),
-            (['feedback', 'review', 'rating', 'comment', 'testimonial'], 'Feedback Form'),
-            (['quote', 'estimate', 'calculate', 'calculator', 'pricing'], 'Quote/Calculator Form'),
-            (['booking', 'reservation', 'appointment', 'schedule', 'book now'], 'Booking Form'),
-            (['application', 'apply', 'job', 'career', 'resume'], 'Application Form'),
-            (['survey', 'poll', 'questionnaire', 'research'], 'Survey Form')
-        ]
-        
-        for keywords, form_type in patterns:
+    def _classify_form_type_advanced(self, form_html_bytes: bytes, form_text: bytes) -> str:
+        """Advanced form type classification from the lowercased form markup and label/placeholder text (UTF-8 bytes)"""
+        
+        all_text = form_html_bytes + b' ' + form_text
+        
+        for keywords, form_type in FORM_TYPE_KEYWORDS:
             if any(keyword in all_text for keyword in keywords):
                 return form_type
         
@@ -553,34 +629,28 @@ class FormValidator:
         
         total_forms = sum(page['forms_with_multiple_inputs'] for page in successful_pages)
         
-        form_types = {}
-        complexity_counts = {'simple_forms': 0, 'medium_forms': 0, 'complex_forms': 0}
+        form_types = Counter()
+        complexities = Counter()
         validation_count = 0
         
         for page in successful_pages:
             for form in page['forms']:
-                # Form type breakdown
-                form_type = form['form_type']
-                form_types[form_type] = form_types.get(form_type, 0) + 1
-                
-                # Complexity breakdown
-                complexity = form['complexity']
-                if complexity == 'simple':
-                    complexity_counts['simple_forms'] += 1
-                elif complexity == 'medium':
-                    complexity_counts['medium_forms'] += 1
-                else:
-                    complexity_counts['complex_forms'] += 1
-                
-                # Validation count
-                if form['has_validation']:
-                    validation_count += 1
+                form_types[form['form_type']] += 1
+                complexities[form['complexity']] += 1
+                validation_count += form['has_validation']
+        
+        # Anything that isn't simple or medium counts as complex
+        complexity_counts = {
+            'simple_forms': complexities['simple'],
+            'medium_forms': complexities['medium'],
+            'complex_forms': sum(complexities.values()) - complexities['simple'] - complexities['medium']
+        }
         
         return {
             'pages_analyzed': len(successful_pages),
             'pages_with_qualifying_forms': len(successful_pages),
             'total_qualifying_forms': total_forms,
-            'form_type_breakdown': form_types,
+            'form_type_breakdown': dict(form_types),
             'complexity_breakdown': complexity_counts,
             'average_forms_per_page': round(total_forms / len(successful_pages), 1) if successful_pages else 0,
             'forms_with_validation': validation_count,
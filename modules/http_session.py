@@ -0,0 +1,54 @@
+import socket
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lru_cache import LRUCache
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+RETRY_STATUSES = (500, 502, 503, 504)
+
+DNS_TTL = 300  # Seconds a resolved address is reused
+
+_resolved = LRUCache(maxsize=1024)
+_system_getaddrinfo = socket.getaddrinfo
+
+def _cached_getaddrinfo(*args, **kwargs):
+    """socket.getaddrinfo with successful lookups reused for DNS_TTL seconds"""
+    key = (args, tuple(sorted(kwargs.items())))
+    cached = _resolved.get(key)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+    # Failures raise and are never cached, so a flaky resolver is retried next time
+    addresses = _system_getaddrinfo(*args, **kwargs)
+    _resolved.put(key, (time.monotonic() + DNS_TTL, addresses))
+    return addresses
+
+# requests resolves through socket.getaddrinfo for every new connection and has no DNS cache of its own
+socket.getaddrinfo = _cached_getaddrinfo
+
+def create_session(pool_connections=32, pool_maxsize=64, retries=2, backoff_factor=0.2, status_forcelist=RETRY_STATUSES):
+    """Build a requests.Session with a sized keep-alive pool and retries on connection errors and retryable statuses"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=status_forcelist,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            # Hand the last 5xx back to the caller so raise_for_status reports it as before
+            raise_on_status=False
+        )
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+# Shared by the detectors so keep-alive connections survive across instances and requests
+shared_session = create_session()
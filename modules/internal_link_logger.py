@@ -1,8 +1,16 @@
-import json
+import logging
+import orjson
 import os
+import re
+from urllib.parse import urlsplit
 from datetime import datetime
 import csv
 
+logger = logging.getLogger(__name__)
+
+# Runs of anything that isn't safe in a filename collapse to one underscore
+SLUG_PATTERN = re.compile(r'[^A-Za-z0-9.-]+')
+
 class InternalLinkLogger:
     def __init__(self, log_dir="logs"):
         self.log_dir = log_dir
@@ -12,21 +20,18 @@ class InternalLinkLogger:
     def log_links(self, url, internal_links):
         """Log internal links to files"""
         try:
-            print(f"📝 Logging {len(internal_links)} internal links...")
+            logger.debug("📝 Logging %d internal links...", len(internal_links))
             
-            # Create filename based on domain and timestamp
-            domain = url.replace('https://', '').replace('http://', '').replace('/', '_')
+            # Create filename based on the URL (minus scheme) and timestamp
+            parts = urlsplit(url)
+            domain = SLUG_PATTERN.sub('_', f"{parts.netloc}{parts.path}?{parts.query}").strip('_')[:120] or 'site'
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             
-            # Log as JSON
             json_filename = f"{self.log_dir}/{domain}_{timestamp}_links.json"
-            self._log_as_json(json_filename, url, internal_links)
-            
-            # Log as CSV
             csv_filename = f"{self.log_dir}/{domain}_{timestamp}_links.csv"
-            self._log_as_csv(csv_filename, url, internal_links)
+            self._write_logs(json_filename, csv_filename, url, internal_links)
             
-            print(f"✅ Links logged to {json_filename} and {csv_filename}")
+            logger.info("✅ Links logged to %s and %s", json_filename, csv_filename)
             
             return {
                 'json_file': json_filename,
@@ -35,30 +40,26 @@ class InternalLinkLogger:
             }
             
         except Exception as e:
-            print(f"❌ Failed to log links: {e}")
+            logger.error("❌ Failed to log links: %s", e)
             return {'error': str(e)}
     
-    def _log_as_json(self, filename, url, links):
-        """Log links as JSON"""
-        data = {
+    def _write_logs(self, json_filename, csv_filename, url, links):
+        """Write the JSON and CSV logs together in a single pass over the links"""
+        header = orjson.dumps({
             'source_url': url,
             'timestamp': datetime.now().isoformat(),
-            'total_links': len(links),
-            'internal_links': links
-        }
+            'total_links': len(links)
+        }, option=orjson.OPT_INDENT_2)
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-    
-    def _log_as_csv(self, filename, url, links):
-        """Log links as CSV"""
-        with open(filename, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
+        with open(json_filename, 'wb') as json_file, \
+                open(csv_filename, 'w', newline='', encoding='utf-8', buffering=1 << 20) as csv_file:
+            writer = csv.writer(csv_file)
             writer.writerow(['URL', 'Link Text', 'Title'])
             
-            for link in links:
-                writer.writerow([
-                    link.get('url', ''),
-                    link.get('text', ''),
-                    link.get('title', '')
-                ])
+            # Reopen the header object so the links stream into an internal_links array, one per line
+            json_file.write(header[:-2] + b',\n  "internal_links": [')
+            for i, link in enumerate(links):
+                json_file.write(b',\n    ' if i else b'\n    ')
+                json_file.write(orjson.dumps(link))
+                writer.writerow((link.get('url', ''), link.get('text', ''), link.get('title', '')))
+            json_file.write(b'\n  ]\n}' if links else b']\n}')
@@ -0,0 +1,56 @@
+import threading
+from collections import OrderedDict
+
+class LRUCache:
+    """Thread-safe mapping that keeps only the most recently used entries
+
+    With maxbytes set, sizeof(value) is also tracked and the least recently used entries are
+    evicted until the values fit; a value larger than maxbytes is not stored at all.
+    """
+
+    def __init__(self, maxsize=256, maxbytes=None, sizeof=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self._data = OrderedDict()
+        self._sizes = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the cached value and mark it as recently used"""
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entries when full"""
+        size = self.sizeof(value) if self.sizeof else 0
+        with self._lock:
+            self._remove(key)
+            if self.maxbytes is not None and size > self.maxbytes:
+                return
+            self._data[key] = value
+            self._sizes[key] = size
+            self._bytes += size
+            while len(self._data) > self.maxsize or (self.maxbytes is not None and self._bytes > self.maxbytes):
+                self._remove(next(iter(self._data)))
+
+    def pop(self, key, default=None):
+        """Remove and return a value"""
+        with self._lock:
+            return self._remove(key, default)
+
+    def prune(self, predicate):
+        """Remove every entry whose value satisfies predicate"""
+        with self._lock:
+            for key in [key for key, value in self._data.items() if predicate(value)]:
+                self._remove(key)
+
+    def _remove(self, key, default=None):
+        if key not in self._data:
+            return default
+        self._bytes -= self._sizes.pop(key)
+        return self._data.pop(key)
@@ -0,0 +1,131 @@
+import logging
+import hashlib
+import time
+from selectolax.lexbor import LexborHTMLParser
+from http_session import shared_session
+from lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Seconds a downloaded body is reused as-is before it is revalidated with its ETag
+PAGE_TTL = 30
+
+# Fail fast on hosts that don't accept a connection; allow slow servers time to send the page
+REQUEST_TIMEOUT = (3.05, 10)
+
+# Larger bodies are cut off here; lexbor copes with the unterminated markup
+MAX_PAGE_BYTES = 5 * 1024 * 1024
+
+# Upper bound on all cached bodies together; every Gunicorn worker process holds its own cache
+MAX_CACHED_BYTES = 64 * 1024 * 1024
+
+# url -> (fetched_at, etag, content, encoding, digest), shared by every PageFetcher
+_recent_bodies = LRUCache(maxsize=256, maxbytes=MAX_CACHED_BYTES, sizeof=lambda entry: len(entry[2]))
+
+def _is_dead(entry):
+    """True for bodies past PAGE_TTL that have no ETag, so they can never be reused"""
+    return not entry[1] and time.monotonic() - entry[0] >= PAGE_TTL
+
+def declared_encoding(response):
+    """Charset from the Content-Type header, if the server sent one"""
+    # requests falls back to ISO-8859-1 for text/* without a charset, which would override the page's <meta charset>
+    if 'charset' in response.headers.get('Content-Type', '').lower():
+        return response.encoding
+    return None
+
+def parse_html(response):
+    """Parse a response body into a lexbor tree"""
+    return parse_markup(response.content, declared_encoding(response))
+
+def parse_markup(content, encoding=None):
+    """Parse raw HTML bytes, decoding them with the declared charset when there is one"""
+    if encoding:
+        try:
+            return LexborHTMLParser(content.decode(encoding, errors='replace'))
+        except LookupError:
+            pass
+    # lexbor reads raw bytes as UTF-8
+    return LexborHTMLParser(content)
+
+class Page:
+    """A downloaded page; the tree and lowercased body are only built when first used"""
+
+    def __init__(self, content, encoding=None, digest=None):
+        self.content = content
+        self.encoding = encoding
+        self.digest = digest or hashlib.blake2b(content, digest_size=16).digest()
+        self._tree = None
+        self._html_bytes = None
+
+    @property
+    def tree(self):
+        if self._tree is None:
+            self._tree = parse_markup(self.content, self.encoding)
+        return self._tree
+
+    @property
+    def html_bytes(self):
+        """Body with ASCII letters lowercased, for fixed-token probes"""
+        # bytes.lower() never decodes and is several times cheaper than str.lower() on non-ASCII pages
+        if self._html_bytes is None:
+            self._html_bytes = self.content.lower()
+        return self._html_bytes
+
+class PageFetcher:
+    """Downloads each URL once so several detectors can share the result"""
+
+    def __init__(self, session=None, timeout=REQUEST_TIMEOUT):
+        self.session = session or shared_session
+        self.timeout = timeout
+        self._pages = {}
+
+    def fetch(self, url):
+        """Return the Page for a URL, downloading it only on first use"""
+        if url not in self._pages:
+            self._pages[url] = Page(*self._download(url))
+        return self._pages[url]
+
+    def _download(self, url):
+        """Return (content, encoding, digest), reusing a recent body or revalidating it with If-None-Match"""
+        cached = _recent_bodies.get(url)
+        if cached and time.monotonic() - cached[0] < PAGE_TTL:
+            return cached[2:]
+        if cached and _is_dead(cached):
+            _recent_bodies.pop(url)
+            cached = None
+
+        headers = {}
+        if cached and cached[1]:
+            headers['If-None-Match'] = cached[1]
+
+        response = self.session.get(url, timeout=self.timeout, headers=headers, stream=True)
+        try:
+            if response.status_code == 304 and cached:
+                _recent_bodies.put(url, (time.monotonic(),) + cached[1:])
+                return cached[2:]
+
+            response.raise_for_status()
+            content, digest = self._read_body(response)
+        finally:
+            response.close()
+
+        encoding = declared_encoding(response)
+        # Expired bodies without an ETag only hold memory, so clear them out while adding this one
+        _recent_bodies.prune(_is_dead)
+        _recent_bodies.put(url, (time.monotonic(), response.headers.get('ETag'), content, encoding, digest))
+        return content, encoding, digest
+
+    def _read_body(self, response):
+        """Read the body in chunks, hashing each one as it arrives and stopping at MAX_PAGE_BYTES"""
+        hasher = hashlib.blake2b(digest_size=16)
+        chunks = []
+        size = 0
+        for chunk in response.iter_content(chunk_size=16384):
+            chunk = chunk[:MAX_PAGE_BYTES - size]
+            chunks.append(chunk)
+            hasher.update(chunk)
+            size += len(chunk)
+            if size >= MAX_PAGE_BYTES:
+                logger.warning(f"⚠️ {response.url} is larger than {MAX_PAGE_BYTES} bytes, analyzing the first part only")
+                break
+        return b''.join(chunks), hasher.digest()
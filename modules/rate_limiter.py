@@ -0,0 +1,27 @@
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+class HostRateLimiter:
+    """Spaces out requests to each host by a jittered interval; different hosts never wait on each other"""
+
+    def __init__(self, min_interval, max_interval=None):
+        self.min_interval = min_interval
+        self.max_interval = min_interval if max_interval is None else max_interval
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        """Block until url's host may be requested again and return how long that took"""
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            # Reserve the slot while holding the lock, then sleep without it
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + random.uniform(self.min_interval, self.max_interval)
+
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
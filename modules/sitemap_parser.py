@@ -1,18 +1,36 @@
-import requests
-from urllib.parse import urljoin, urlparse
-import xml.etree.ElementTree as ET
+import logging
+import re
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from lxml import etree
+from http_session import shared_session
+
+logger = logging.getLogger(__name__)
+
+SITEMAP_NAMESPACE = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+LOC_TAGS = (f'{{{SITEMAP_NAMESPACE}}}loc', 'loc')
+# Indexes shouldn't nest, but some do; bound the recursion and the fan-out per index
+MAX_INDEX_DEPTH = 2
+MAX_CHILD_SITEMAPS = 50
+# Child sitemaps fetched at once, from one pool for the whole crawl
+MAX_SITEMAP_WORKERS = 16
+# parse_sitemap returns this many URLs, so no more child sitemaps are fetched once it is reached
+SITEMAP_URL_LIMIT = 100
+# The sitemap protocol's own limit for an uncompressed file
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024
+
+# Fallback for sitemaps that aren't well-formed XML
+LOC_PATTERN = re.compile(r'<loc>\s*(.*?)\s*</loc>', re.S)
 
 class SitemapParser:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        self.session = shared_session
     
     def parse_sitemap(self, url):
         """Parse sitemap.xml to find URLs"""
         try:
-            print(f"🗺️ Parsing sitemap for: {url}")
+            logger.debug("🗺️ Parsing sitemap for: %s", url)
             
             base_url = f"{urlparse(url).scheme}://{urlparse(url).netloc}"
             sitemap_urls = []
@@ -24,65 +42,161 @@ class SitemapParser:
                 f"{base_url}/sitemaps.xml"
             ]
             
-            for sitemap_url in sitemap_locations:
-                try:
-                    urls = self._parse_single_sitemap(sitemap_url)
-                    sitemap_urls.extend(urls)
-                    if urls:  # If we found URLs, break
-                        break
-                except Exception as e:
-                    print(f"⚠️ Failed to parse {sitemap_url}: {e}")
-                    continue
+            # Probe every location at once, reading only status and headers, then parse
+            # the first one that has URLs in priority order
+            with ThreadPoolExecutor(max_workers=len(sitemap_locations)) as executor:
+                responses = list(executor.map(self._probe_sitemap, sitemap_locations))
             
-            # Remove duplicates
-            unique_urls = list(set(sitemap_urls))
+            try:
+                for sitemap_url, response in zip(sitemap_locations, responses):
+                    if response is None:
+                        continue
+                    try:
+                        urls = self._collect_sitemap_urls(sitemap_url, response)
+                        sitemap_urls.extend(urls)
+                        if urls:  # If we found URLs, break
+                            break
+                    except Exception as e:
+                        logger.warning("⚠️ Failed to parse %s: %s", sitemap_url, e)
+                        continue
+            finally:
+                for response in responses:
+                    if response is not None:
+                        response.close()
+            
+            # Remove duplicates, keeping sitemap order
+            unique_urls = list(dict.fromkeys(sitemap_urls))
             
-            print(f"✅ Found {len(unique_urls)} URLs in sitemaps")
+            logger.info("✅ Found %d URLs in sitemaps", len(unique_urls))
             
             return {
-                'urls': unique_urls[:100],  # Limit to 100 URLs
+                'urls': unique_urls[:SITEMAP_URL_LIMIT],
                 'total_found': len(unique_urls)
             }
             
         except Exception as e:
-            print(f"❌ Sitemap parsing failed: {e}")
+            logger.error("❌ Sitemap parsing failed: %s", e)
             return {
                 'urls': [],
                 'total_found': 0,
                 'error': str(e)
             }
     
-    def _parse_single_sitemap(self, sitemap_url):
-        """Parse a single sitemap XML file"""
+    def _probe_sitemap(self, sitemap_url):
+        """Request a sitemap location and return the open response if it serves a sitemap, else None"""
         try:
-            response = self.session.get(sitemap_url, timeout=10)
-            response.raise_for_status()
-            
-            # Try to parse as XML
-            try:
-                root = ET.fromstring(response.content)
-                urls = []
-                
-                # Handle regular sitemap files
-                for url_elem in root.findall('.//{http://www.sitemaps.org/schemas/sitemap/0.9}url'):
-                    loc = url_elem.find('{http://www.sitemaps.org/schemas/sitemap/0.9}loc')
-                    if loc is not None:
-                        urls.append(loc.text)
-                
-                # If no URLs found with namespace, try without
-                if not urls:
-                    for url_elem in root.findall('.//url'):
-                        loc = url_elem.find('loc')
-                        if loc is not None:
-                            urls.append(loc.text)
+            response = self.session.get(sitemap_url, timeout=10, stream=True)
+        except Exception as e:
+            logger.warning("⚠️ Failed to fetch %s: %s", sitemap_url, e)
+            return None
+        
+        # Missing sitemaps are often answered with a 200 HTML page; neither kind of miss has its body read
+        if response.status_code >= 400 or 'html' in response.headers.get('Content-Type', '').lower():
+            logger.debug("No sitemap at %s (HTTP %s)", sitemap_url, response.status_code)
+            response.close()
+            return None
+        return response
+    
+    def _collect_sitemap_urls(self, sitemap_url, response):
+        """Parse an open sitemap response and, for an index, its child sitemaps level by level"""
+        urls, child_sitemaps = self._parse_sitemap_response(response)
+        found = dict.fromkeys(urls)
+        if not child_sitemaps:
+            return list(found)
+        
+        seen = {sitemap_url, response.url}
+        with ThreadPoolExecutor(max_workers=MAX_SITEMAP_WORKERS) as executor:
+            for _ in range(MAX_INDEX_DEPTH):
+                pending = [child for child in dict.fromkeys(child_sitemaps) if child not in seen]
+                if len(pending) > MAX_CHILD_SITEMAPS:
+                    logger.warning("⚠️ Sitemap index lists %d sitemaps, reading the first %d", len(pending), MAX_CHILD_SITEMAPS)
+                    pending = pending[:MAX_CHILD_SITEMAPS]
+                seen.update(pending)
+                child_sitemaps = []
                 
-                return urls
+                # One batch at a time in index order, so the crawl stops as soon as enough URLs are in hand
+                for start in range(0, len(pending), MAX_SITEMAP_WORKERS):
+                    if len(found) >= SITEMAP_URL_LIMIT:
+                        break
+                    for child_urls, grandchildren in executor.map(self._parse_child_sitemap, pending[start:start + MAX_SITEMAP_WORKERS]):
+                        found.update(dict.fromkeys(child_urls))
+                        child_sitemaps.extend(grandchildren)
                 
-            except ET.ParseError:
-                # If XML parsing fails, try to extract URLs with regex
-                import re
-                urls = re.findall(r'<loc>(.*?)</loc>', response.text)
-                return urls
+                if not child_sitemaps or len(found) >= SITEMAP_URL_LIMIT:
+                    break
+        
+        return list(found)
+    
+    def _parse_child_sitemap(self, child_url):
+        """Parse a sitemap listed in an index; failures are logged and yield nothing"""
+        try:
+            return self._parse_single_sitemap(child_url)
+        except Exception as e:
+            logger.warning("⚠️ Failed to parse %s: %s", child_url, e)
+            return [], []
+    
+    def _parse_single_sitemap(self, sitemap_url):
+        """Fetch and parse a single sitemap XML file, returning (page URLs, child sitemap URLs)"""
+        try:
+            response = self.session.get(sitemap_url, timeout=10, stream=True)
+            try:
+                response.raise_for_status()
+                # Missing sitemaps are often answered with a 200 HTML page; don't download it
+                if 'html' in response.headers.get('Content-Type', '').lower():
+                    return [], []
+                return self._parse_sitemap_response(response)
+            finally:
+                response.close()
                 
         except Exception as e:
             raise Exception(f"Failed to parse sitemap: {e}")
+    
+    def _parse_sitemap_response(self, response):
+        """Read and parse an open sitemap response into (page URLs, child sitemap URLs)"""
+        content = self._read_body(response)
+        
+        # Try to parse as XML
+        urls = []
+        child_sitemaps = []
+        try:
+            for parent_tag, loc in self._iter_locs(content):
+                if parent_tag == 'url':
+                    urls.append(loc)
+                elif parent_tag == 'sitemap':
+                    child_sitemaps.append(loc)
+            
+        except etree.XMLSyntaxError:
+            # If XML parsing fails, try to extract URLs with regex
+            urls = LOC_PATTERN.findall(content.decode(response.encoding or 'utf-8', errors='replace'))
+            return urls, []
+        
+        return urls, child_sitemaps
+    
+    def _read_body(self, response):
+        """Read a streamed sitemap, stopping at MAX_SITEMAP_BYTES"""
+        chunks = []
+        size = 0
+        for chunk in response.iter_content(chunk_size=65536):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= MAX_SITEMAP_BYTES:
+                logger.warning("⚠️ %s is larger than %d bytes, reading the first part only", response.url, MAX_SITEMAP_BYTES)
+                break
+        return b''.join(chunks)[:MAX_SITEMAP_BYTES]
+    
+    def _iter_locs(self, content):
+        """Yield (parent tag, text) for each <loc>, discarding elements once read so memory stays flat"""
+        for _, elem in etree.iterparse(BytesIO(content), tag=LOC_TAGS, resolve_entities=False, no_network=True):
+            parent = elem.getparent()
+            parent_tag = etree.QName(parent).localname if parent is not None else ''
+            # Pretty-printed sitemaps wrap the URL in whitespace, which would otherwise end up in the request
+            loc = (elem.text or '').strip()
+            if loc:
+                yield parent_tag, loc
+            
+            # Drop the <loc> and every <url>/<sitemap> entry before the current one
+            elem.clear()
+            container = parent.getparent() if parent is not None else None
+            if container is not None:
+                while parent.getprevious() is not None:
+                    del container[0]
@@ -0,0 +1,27 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+from selectolax.lexbor import LexborHTMLParser
+from element_analyzer import ElementAnalyzer
+
+class ExtractInternalLinksTest(unittest.TestCase):
+    def extract(self, html, url='https://example.com/'):
+        return [link['url'] for link in ElementAnalyzer()._extract_internal_links(LexborHTMLParser(html), url)]
+
+    def test_lookalike_hosts_are_external(self):
+        html = ('<a href="https://example.com.evil.io/x">a</a>'
+                '<a href="https://example.community/y">b</a>'
+                '<a href="/about">c</a>'
+                '<a href="https://example.com/contact">d</a>')
+        self.assertEqual(self.extract(html), ['https://example.com/about', 'https://example.com/contact'])
+
+    def test_skipped_schemes_are_ignored(self):
+        html = ('<a href="javascript:void(0)">a</a><a href="data:text/html,x">b</a>'
+                '<a href="mailto:a@example.com">c</a><a href="#top">d</a><a href=" /page ">e</a>')
+        self.assertEqual(self.extract(html), ['https://example.com/page'])
+
+if __name__ == '__main__':
+    unittest.main()